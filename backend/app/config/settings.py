@@ -14,6 +14,8 @@ TOKEN_URI = os.environ.get("TOKEN_URI")
 AUTH_PROVIDER_X509_CERT_URL = os.environ.get("AUTH_PROVIDER_X509_CERT_URL")
 REDIRECT_URIS = os.environ.get("REDIRECT_URIS").split(",")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_API_BASE = os.environ.get("OPENAI_API_BASE")  # Overrides the OpenAI URL (the load tests point it at a stub)
+GOOGLE_API_ENDPOINT = os.environ.get("GOOGLE_API_ENDPOINT")  # Overrides the My Business API root, likewise
 SECRET_KEY = os.environ["SECRET_KEY"]
 
 # Redis Configuration
@@ -28,6 +30,87 @@ DB_NAME = os.environ.get("DB_NAME")
 DB_USER = os.environ.get("DB_USER")
 DB_PASSWORD = os.environ.get("DB_PASSWORD")
 DB_PORT = os.environ.get("DB_PORT")
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "5"))
+DB_POOL_WAIT = float(os.environ.get("DB_POOL_WAIT", "10"))  # Seconds to wait for a free pooled connection
+
+# Resilience Configuration
+GOOGLE_TIMEOUT = float(os.environ.get("GOOGLE_TIMEOUT", "10"))  # Seconds per Google API / OAuth call
+OPENAI_TIMEOUT = float(os.environ.get("OPENAI_TIMEOUT", "30"))  # Seconds per OpenAI call
+DB_CONNECT_TIMEOUT = int(os.environ.get("DB_CONNECT_TIMEOUT", "5"))  # Seconds to open a PostgreSQL connection
+DB_STATEMENT_TIMEOUT = int(os.environ.get("DB_STATEMENT_TIMEOUT", "10"))  # Seconds per PostgreSQL statement
+REDIS_TIMEOUT = float(os.environ.get("REDIS_TIMEOUT", "2"))  # Seconds per Redis command or pool checkout
+REDIS_MAX_CONNECTIONS = int(os.environ.get("REDIS_MAX_CONNECTIONS", "32"))  # Redis bulkhead: pool size per process
+UPSTREAM_CONCURRENCY = {  # Bulkheads: concurrent calls per process
+    "google": int(os.environ.get("GOOGLE_CONCURRENCY", "8")),
+    "openai": int(os.environ.get("OPENAI_CONCURRENCY", "8")),
+}
+BULKHEAD_WAIT = float(os.environ.get("BULKHEAD_WAIT", "0.5"))  # Seconds to wait for a bulkhead slot before failing fast
+BATCH_BULKHEAD_WAIT = float(os.environ.get("BATCH_BULKHEAD_WAIT", "60"))  # Same, for batch LLM work that would rather queue
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", "5"))  # Failures within the window that open a circuit
+CIRCUIT_WINDOW = int(os.environ.get("CIRCUIT_WINDOW", "60"))  # Seconds failures are counted over
+CIRCUIT_RESET_TIMEOUT = int(os.environ.get("CIRCUIT_RESET_TIMEOUT", "30"))  # Seconds an open circuit rejects calls
+
+# Session Configuration
+SESSION_LIFETIME = int(os.environ.get("SESSION_LIFETIME", str(24 * 3600)))  # Sliding TTL of an idle session, in seconds
+SESSION_REFRESH_INTERVAL = int(os.environ.get("SESSION_REFRESH_INTERVAL", "3600"))  # Min seconds between TTL bumps
+
+# Startup Configuration
+# "lazy" imports OpenAI, Google auth and psycopg2 on first use;
+# "preload" imports them in create_app() (pair with gunicorn preload_app)
+STARTUP_MODE = os.environ.get("STARTUP_MODE", "lazy")
+
+# HTTP Caching Configuration
+REVIEWS_MAX_AGE = int(os.environ.get("REVIEWS_MAX_AGE", "60"))  # Seconds browsers may reuse review/summary responses
+COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", "1024"))  # Smaller JSON bodies are sent uncompressed
+STREAM_MIN_ITEMS = int(os.environ.get("STREAM_MIN_ITEMS", "500"))  # Review lists this long are streamed in chunks
+SUMMARY_TTL = int(os.environ.get("SUMMARY_TTL", str(30 * 24 * 3600)))  # Seconds a generated summary artifact is kept
+
+# Embedding and Topic Configuration
+EMBEDDING_PROVIDER = os.environ.get("EMBEDDING_PROVIDER", "openai" if OPENAI_API_KEY else "hashing")  # "hashing" works offline
+EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE", "100"))
+TOPIC_CLUSTERS = int(os.environ.get("TOPIC_CLUSTERS", "6"))
+
+# Reply Pipeline Configuration
+REPLY_DRAFT_BATCH_SIZE = int(os.environ.get("REPLY_DRAFT_BATCH_SIZE", "10"))  # Reviews drafted per LLM call
+REPLY_DRAFT_WORKERS = int(os.environ.get("REPLY_DRAFT_WORKERS", "4"))  # Concurrent LLM calls while drafting
+REPLY_POST_WORKERS = int(os.environ.get("REPLY_POST_WORKERS", "8"))  # Concurrent updateReply calls
+REPLY_POSTS_PER_SECOND = float(os.environ.get("REPLY_POSTS_PER_SECOND", "5"))  # Google API rate limit
+REPLY_POSTING_TIMEOUT = int(os.environ.get("REPLY_POSTING_TIMEOUT", "600"))  # Seconds before an unfinished claim is reclaimed
+
+# Background Job Configuration
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))  # Background job threads per process
+JOB_LOCK_TTL = int(os.environ.get("JOB_LOCK_TTL", "1800"))  # Seconds a deduplicated job blocks another of its kind
+
+# Location Registry Configuration
+LOCATIONS_RELOAD_INTERVAL = int(os.environ.get("LOCATIONS_RELOAD_INTERVAL", "300"))  # Safety-net reload if a pub/sub message is missed
+
+# History Configuration
+REPORT_TIMEZONE = os.environ.get("REPORT_TIMEZONE", "America/Chicago")  # Day and week boundaries for snapshots and rollups
+
+# Admin Configuration
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")  # Admin-only routes are disabled when unset
+
+# Summary Routing Configuration
+SUMMARY_MODE = os.environ.get("SUMMARY_MODE", "fast")  # fast, balanced or thorough, unless a request or location says otherwise
+SUMMARY_VERBATIM_WORDS = int(os.environ.get("SUMMARY_VERBATIM_WORDS", "8"))  # Shorter comments are their own summary
+SUMMARY_SHORT_REVIEW_WORDS = int(os.environ.get("SUMMARY_SHORT_REVIEW_WORDS", "30"))  # Shorter comments take the fast path
+
+# Digest Report Configuration
+REPORTS_DIR = os.environ.get("REPORTS_DIR", "reports")  # Where rendered digests are written and served from
+REPORT_SUMMARY_MODE = os.environ.get("REPORT_SUMMARY_MODE", "balanced")  # Summary mode for scheduled digests
+REPORT_WORKERS = int(os.environ.get("REPORT_WORKERS", "4"))  # Processes building digests; each has its own LLM concurrency
+REPORT_MAX_REVIEWS = int(os.environ.get("REPORT_MAX_REVIEWS", "500"))  # Reviews per location per digest
+REPORT_WEEKS = int(os.environ.get("REPORT_WEEKS", "4"))  # Weekly rollups shown for the trend
+REPORT_REFRESH_TOKEN = os.environ.get("REPORT_REFRESH_TOKEN")  # Google refresh token digests sync reviews with; no sync when unset
+REPORT_STALE_HOURS = int(os.environ.get("REPORT_STALE_HOURS", "36"))  # Digests warn when a location's last sync is older
+REPORT_WEEKDAY = int(os.environ.get("REPORT_WEEKDAY", "0"))  # Day scheduled runs start on (0 is Monday), in REPORT_TIMEZONE
+REPORT_HOUR = int(os.environ.get("REPORT_HOUR", "6"))  # Hour scheduled runs start at, in REPORT_TIMEZONE
+
+# Profiling Configuration
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "false").lower() == "true"  # Registers the admin profiling hooks and routes
+PROFILER_SAMPLING = os.environ.get("PROFILER_SAMPLING", "false").lower() == "true"  # Always-on stack sampler per worker
+PROFILER_INTERVAL = float(os.environ.get("PROFILER_INTERVAL", "0.02"))  # Seconds between stack samples
+TRACEMALLOC_FRAMES = int(os.environ.get("TRACEMALLOC_FRAMES", "10"))  # Frames kept per allocation traceback
 
 # Other Configs
 SCOPES = ["https://www.googleapis.com/auth/business.manage"]
@@ -35,6 +118,7 @@ API_SERVICE_NAME = "mybusiness"
 API_VERSION = "v4"
 
 # Locations Dictionary
+# Seeds the locations table on first run; the registry reads the database after that
 LOCATIONS = {
     "Reed Jeep Chrysler Dodge Ram of Kansas City Service Center": ("107525660123223074874", "6602925040958900944"),
     "Reed Jeep of Kansas City": ("107525660123223074874", "1509419292313302599"),
@@ -1,46 +1,63 @@
-# app/__init__.py
+# app/main.py
 from flask import Flask
 from flask_cors import CORS
-from flask_session import Session
 from werkzeug.middleware.proxy_fix import ProxyFix
 from app.config import settings
-from app.utils import redis_operations, google_api, openai_operations, db_operations
-from redis_operations import init_redis
-from .utils import openai_operations
-from app.utils import openai_operations
-from openai_operations import initialize_openai, add_summarize_reviews_route
-from app.utils import redis_operations
+from app.utils import redis_operations, startup, http_cache, profiling
+from app.utils.session_interface import RedisSessionInterface
+from app.routes.auth_routes import auth_routes
+from app.routes.review_routes import review_routes
+from app.routes.reply_routes import reply_routes
+from app.routes.location_routes import location_routes
+from app.routes.report_routes import report_routes
+from app.routes.profiling_routes import profiling_routes
+from app.routes.job_routes import job_routes
 import logging  # For the logger
 
 def create_app():
-    app = Flask(__name__)
-    CORS(
-        app,
-        supports_credentials=True,
-        origins=["https://app.gmb.reedauto.com", "https://localhost:3000"],
-    )
-    app.wsgi_app = ProxyFix(app.wsgi_app)
-    app.secret_key = settings.SECRET_KEY
+    with startup.timed("create_app"):
+        app = Flask(__name__)
+        CORS(
+            app,
+            supports_credentials=True,
+            origins=["https://app.gmb.reedauto.com", "https://localhost:3000"],
+            expose_headers=["X-Next-Cursor", "X-Served-From", "X-Profile-Id", "X-Profile-Formats"],
+        )
+        app.wsgi_app = ProxyFix(app.wsgi_app)
+        app.secret_key = settings.SECRET_KEY
 
-    # Initialize Logger
-    logging.basicConfig(level=logging.DEBUG)
-    logger = logging.getLogger(__name__)
+        # Initialize Logger
+        logging.basicConfig(level=logging.DEBUG)
 
-    # Redis Session Configuration
-    app.config["SESSION_TYPE"] = "redis"
-    app.config["SESSION_PERMANENT"] = False
-    app.config["SESSION_USE_SIGNER"] = True
-    app.config["SESSION_KEY_PREFIX"] = "session:"
-    redis_client = redis_operations.init_redis()  # Initialize Redis client
-    app.config["SESSION_REDIS"] = redis_client
-    Session(app)
-    redis_client = init_redis()
+        # Redis Session Configuration
+        # Shared client; it only connects once a request touches the session
+        app.session_interface = RedisSessionInterface(
+            redis_operations.get_redis(),
+            key_prefix="session:",
+            lifetime=settings.SESSION_LIFETIME,
+            refresh_interval=settings.SESSION_REFRESH_INTERVAL,
+        )
 
-    # Initialize APIs
-    google_api.load_google_api_config()
-    initialize_openai(api_key="OPENAI_API_KEY")  # Initialize OpenAI only once
+        # Routes import Google, OpenAI and psycopg2 on first use. In "preload"
+        # mode they are imported here instead, so a gunicorn master started
+        # with preload_app hands them to every worker it forks.
+        if settings.STARTUP_MODE == "preload":
+            startup.warm_up()
 
-    # Add the summarize_reviews route to the Flask app
-    add_summarize_reviews_route(app, redis_client, logger)
-    
+        app.register_blueprint(auth_routes)
+        app.register_blueprint(review_routes)
+        app.register_blueprint(reply_routes)
+        app.register_blueprint(location_routes)
+        app.register_blueprint(report_routes)
+        app.register_blueprint(job_routes)
+
+        # Opt-in, admin-only profiling. Registered before compression so its
+        # after_request hook runs last and the capture includes compression.
+        if settings.PROFILING_ENABLED:
+            profiling.init_app(app)
+            app.register_blueprint(profiling_routes)
+        http_cache.init_app(app)
+
+    app.config["STARTUP_TIMINGS"] = dict(startup.timings)
+    startup.report()
     return app
@@ -0,0 +1,37 @@
+# app/models/location.py
+import re
+
+# One row per Google Business Profile location (rooftop). group_name groups
+# the rooftops of one dealership; brand is the make it sells or services.
+LOCATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS locations (
+    location_id  TEXT PRIMARY KEY,
+    account_id   TEXT NOT NULL,
+    name         TEXT NOT NULL UNIQUE,
+    brand        TEXT,
+    group_name   TEXT,
+    active       BOOLEAN NOT NULL DEFAULT TRUE,
+    updated_at   TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS locations_account_idx ON locations (account_id);
+-- Default summary mode for the location (NULL: settings.SUMMARY_MODE)
+ALTER TABLE locations ADD COLUMN IF NOT EXISTS summary_mode TEXT;
+"""
+
+LOCATION_COLUMNS = ("location_id", "account_id", "name", "brand", "group_name", "active", "summary_mode")
+
+# Checked in order, so multi-make names resolve to the first listed make
+BRANDS = ("Jeep", "Chrysler", "Dodge", "Ram", "Hyundai", "Chevrolet", "Buick GMC", "Collision")
+
+
+def guess_brand(name):
+    """Best-effort brand from a display name, used when seeding."""
+    for brand in BRANDS:
+        if brand.lower() in name.lower():
+            return brand
+    return None
+
+
+def normalize_name(name):
+    """Lookup key for display names: case, punctuation and spacing are ignored."""
+    return " ".join(re.findall(r"[a-z0-9]+", name.lower()))
@@ -0,0 +1,25 @@
+# app/models/reply.py
+
+# Drafted replies waiting for approval and posting. status moves
+# pending -> approved -> posting -> posted (or rejected / failed); a reply
+# left in posting by a crashed run is claimed again once it goes stale.
+# idempotency_key hashes the review and reply text. posted_key is written
+# just before the text is sent to Google, so a reclaimed reply whose
+# posted_key matches may already be on Google and is checked first.
+REPLIES_TABLE = """
+CREATE TABLE IF NOT EXISTS review_replies (
+    review_id        TEXT PRIMARY KEY REFERENCES reviews (review_id),
+    location_name    TEXT NOT NULL,
+    draft            TEXT NOT NULL,
+    status           TEXT NOT NULL DEFAULT 'pending',
+    idempotency_key  TEXT,
+    posted_key       TEXT,
+    error            TEXT,
+    created_at       TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at       TIMESTAMPTZ NOT NULL DEFAULT now(),
+    posted_at        TIMESTAMPTZ
+);
+CREATE INDEX IF NOT EXISTS review_replies_status_idx ON review_replies (status, location_name);
+"""
+
+REPLY_STATUSES = ("pending", "approved", "posting", "posted", "rejected", "failed")
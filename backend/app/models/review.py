@@ -0,0 +1,65 @@
+# app/models/review.py
+import json
+
+# Google returns star ratings as words
+STAR_RATINGS = {"ONE": 1, "TWO": 2, "THREE": 3, "FOUR": 4, "FIVE": 5}
+
+# One row per Google review. `search` is maintained by PostgreSQL from the
+# comment and reviewer name, and the GIN index over it serves full-text search.
+REVIEWS_TABLE = """
+CREATE TABLE IF NOT EXISTS reviews (
+    review_id      TEXT PRIMARY KEY,
+    location_name  TEXT NOT NULL,
+    account_id     TEXT NOT NULL,
+    location_id    TEXT NOT NULL,
+    reviewer_name  TEXT,
+    star_rating    SMALLINT,
+    comment        TEXT,
+    reply_comment  TEXT,
+    create_time    TIMESTAMPTZ,
+    update_time    TIMESTAMPTZ,
+    raw            JSONB NOT NULL,
+    search         TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(comment, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(reviewer_name, '')), 'B')
+    ) STORED
+);
+CREATE INDEX IF NOT EXISTS reviews_search_idx ON reviews USING GIN (search);
+CREATE INDEX IF NOT EXISTS reviews_location_time_idx ON reviews (location_name, create_time DESC);
+CREATE INDEX IF NOT EXISTS reviews_rating_idx ON reviews (star_rating);
+CREATE INDEX IF NOT EXISTS reviews_location_id_time_idx ON reviews (location_id, create_time);
+"""
+
+# Progress of each location's full-history walk. page_token is where the
+# walk resumes; once history_complete is set, syncs only page until they
+# reach reviews that are already stored.
+REVIEW_SYNC_TABLE = """
+CREATE TABLE IF NOT EXISTS review_sync_state (
+    location_id       TEXT PRIMARY KEY,
+    page_token        TEXT,
+    history_complete  BOOLEAN NOT NULL DEFAULT false,
+    updated_at        TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+"""
+
+REVIEW_COLUMNS = (
+    "review_id", "location_name", "account_id", "location_id", "reviewer_name",
+    "star_rating", "comment", "reply_comment", "create_time", "update_time", "raw",
+)
+
+
+def review_row(location_name, account_id, location_id, review):
+    """Map a Google review dict to a tuple in REVIEW_COLUMNS order."""
+    return (
+        review["reviewId"],
+        location_name,
+        account_id,
+        location_id,
+        review.get("reviewer", {}).get("displayName"),
+        STAR_RATINGS.get(review.get("starRating")),
+        review.get("comment"),
+        review.get("reviewReply", {}).get("comment"),
+        review.get("createTime"),
+        review.get("updateTime"),
+        json.dumps(review),
+    )
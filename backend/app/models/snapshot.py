@@ -0,0 +1,60 @@
+# app/models/snapshot.py
+
+STAR_COLUMNS = ("star_1", "star_2", "star_3", "star_4", "star_5")
+_STATS = """
+    review_count   INTEGER NOT NULL,
+    rating_sum     INTEGER NOT NULL,
+    star_1         INTEGER NOT NULL,
+    star_2         INTEGER NOT NULL,
+    star_3         INTEGER NOT NULL,
+    star_4         INTEGER NOT NULL,
+    star_5         INTEGER NOT NULL,
+    replied_count  INTEGER NOT NULL,"""
+
+# Append-only daily state of each location: one row per location per day,
+# overwritten only by later syncs on the same day. Partitioned by month so
+# trend queries prune to the months they cover. The google_* columns are the
+# totals Google reports, independent of how many reviews are stored locally.
+SNAPSHOTS_TABLE = f"""
+CREATE TABLE IF NOT EXISTS review_snapshots (
+    location_id    TEXT NOT NULL,
+    snapshot_date  DATE NOT NULL,{_STATS}
+    taken_at       TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (location_id, snapshot_date)
+) PARTITION BY RANGE (snapshot_date);
+ALTER TABLE review_snapshots ADD COLUMN IF NOT EXISTS google_review_count INTEGER;
+ALTER TABLE review_snapshots ADD COLUMN IF NOT EXISTS google_average_rating NUMERIC(3, 2);
+"""
+
+# Reviews created per day and per week, recomputed only for the periods a
+# sync touched. period is 'day' or 'week' (weeks start on Monday).
+ROLLUPS_TABLE = f"""
+CREATE TABLE IF NOT EXISTS review_rollups (
+    location_id    TEXT NOT NULL,
+    period         TEXT NOT NULL,
+    period_start   DATE NOT NULL,{_STATS}
+    PRIMARY KEY (location_id, period, period_start)
+);
+"""
+
+ROLLUP_PERIODS = ("day", "week")
+STAT_COLUMNS = ("review_count", "rating_sum") + STAR_COLUMNS + ("replied_count",)
+
+# Aggregates over `reviews r` matching STAT_COLUMNS
+STAT_AGGREGATES = ", ".join(
+    ["count(r.review_id)", "coalesce(sum(r.star_rating), 0)"]
+    + [f"count(*) FILTER (WHERE r.star_rating = {stars})" for stars in range(1, 6)]
+    + ["count(*) FILTER (WHERE r.reply_comment IS NOT NULL)"]
+)
+
+
+def partition_ddl(month_start):
+    """DDL for the monthly partition starting at `month_start` (a date)."""
+    if month_start.month == 12:
+        next_month = month_start.replace(year=month_start.year + 1, month=1)
+    else:
+        next_month = month_start.replace(month=month_start.month + 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS review_snapshots_{month_start:%Y_%m} "
+        f"PARTITION OF review_snapshots FOR VALUES FROM ('{month_start}') TO ('{next_month}')"
+    )
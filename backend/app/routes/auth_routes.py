@@ -1,38 +1,30 @@
 from flask import Blueprint, request, session, jsonify, redirect, current_app
 import secrets
-import google.oauth2.credentials
-import google_auth_oauthlib.flow
 from app.config import settings  # Import settings or config module
-from app.utils.redis_operations import init_redis  # Import Redis utility
+from app.utils.redis_operations import get_redis  # Import Redis utility
+from app.utils.startup import lazy_import
+from app.utils import http_cache, resilience
+from app.utils.google_api import credentials_to_dict
 
 auth_routes = Blueprint('auth_routes', __name__)
 
+OAUTH_STATE_TTL = 600  # Seconds a user has to finish the Google consent screen
+
 # Helper Functions
 def generate_random_string(length):
     return secrets.token_hex(length)
 
-def credentials_to_dict(credentials):
-    return {
-        "token": credentials.token,
-        "refresh_token": credentials.refresh_token,
-        "token_uri": credentials.token_uri,
-        "client_id": credentials.client_id,
-        "client_secret": credentials.client_secret,
-        "scopes": credentials.scopes,
-    }
-
 # Routes
 @auth_routes.route("/authorize")
 def authorize():
     # Use the already initialized Redis client
-    redis_client = init_redis()
+    redis_client = get_redis()
 
+    # The state key carries next_page, so neither touches the session
     state = generate_random_string(32)
-    redis_client.set("state", state)
-
     next_page = request.args.get("next", "https://localhost:3000/")
     current_app.logger.debug(f"Setting next_page to {next_page}")
-    session["next_page"] = next_page
+    redis_client.setex(f"oauth_state:{state}", OAUTH_STATE_TTL, next_page)
 
     client_config = {
         "web": {
@@ -44,7 +36,7 @@ def authorize():
             "redirect_uris": settings.REDIRECT_URIS,
         }
     }
-    flow = google_auth_oauthlib.flow.Flow.from_client_config(
+    flow = lazy_import("google_auth_oauthlib.flow").Flow.from_client_config(
         client_config, scopes=settings.SCOPES
     )
     flow.redirect_uri = request.url_root + "oauth2callback"
@@ -58,13 +50,11 @@ def authorize():
 
 @auth_routes.route("/oauth2callback")
 def oauth2callback():
-    redis_client = init_redis()
-    stored_state = redis_client.get("state")
-    if stored_state is not None:
-        stored_state = stored_state.decode()
+    redis_client = get_redis()
     url_state = request.args.get("state")
+    next_page = redis_client.get(f"oauth_state:{url_state}") if url_state else None
 
-    if stored_state is None or stored_state != url_state:
+    if next_page is None:
         current_app.logger.error("Invalid state")
         return "Invalid state", 400
 
@@ -80,31 +70,41 @@ def oauth2callback():
         }
     }
 
-    flow = google_auth_oauthlib.flow.Flow.from_client_config(
-        client_config, scopes=settings.SCOPES, state=stored_state
+    flow = lazy_import("google_auth_oauthlib.flow").Flow.from_client_config(
+        client_config, scopes=settings.SCOPES, state=url_state
     )
     flow.redirect_uri = request.url_root + "oauth2callback"
 
     authorization_response = request.url
     try:
-        flow.fetch_token(authorization_response=authorization_response)
+        resilience.call(
+            "google",
+            flow.fetch_token,
+            authorization_response=authorization_response,
+            timeout=settings.GOOGLE_TIMEOUT,
+        )
     except Exception as e:
         current_app.logger.error(f"Exception occurred: {e}")
         return f"Error: {e}", 500
 
     credentials = flow.credentials
     session["credentials"] = credentials_to_dict(credentials)
-    session["access_token"] = credentials.token
 
-    redis_client.delete("state")
+    redis_client.delete(f"oauth_state:{url_state}")
 
-    next_page = session.get("next_page", "https://localhost:3000")
-    return redirect(next_page or "/")
+    return redirect(next_page.decode() or "/")
 
 @auth_routes.route("/check_auth")
 def check_auth():
     if "credentials" in session:
-        access_token = session.get("access_token")
-        return jsonify({"isAuthenticated": True, "access_token": access_token})
+        access_token = session["credentials"]["token"]
+        etag = http_cache.make_etag("auth", access_token)
+        body = {"isAuthenticated": True, "access_token": access_token}
     else:
-        return jsonify({"isAuthenticated": False})
+        etag = http_cache.make_etag("auth", None)
+        body = {"isAuthenticated": False}
+
+    # Always revalidate: the answer changes as soon as the user logs in or out
+    if http_cache.is_not_modified(etag):
+        return http_cache.not_modified_response(etag)
+    return http_cache.cacheable(jsonify(body), etag)
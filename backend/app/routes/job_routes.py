@@ -0,0 +1,24 @@
+from flask import Blueprint, jsonify
+from app.utils import jobs
+from app.utils.admin import login_required
+import logging
+
+# Initialize the Blueprint
+job_routes = Blueprint('job_routes', __name__)
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+@job_routes.route('/jobs/<job_id>', methods=['GET'])
+@login_required
+def get_job(job_id):
+    """Status of a background job started by another route; poll until done or failed."""
+    try:
+        job = jobs.load(job_id)
+        if job is None:
+            return jsonify({"error": "Job not found or expired"}), 404
+        return jsonify(job)
+    except Exception as e:
+        logger.error(f"Exception occurred: {e}")
+        logger.exception("Exception details:")
+        return jsonify({"error": str(e)}), 500
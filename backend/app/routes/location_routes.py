@@ -0,0 +1,45 @@
+from flask import Blueprint, request, jsonify
+from app.utils import http_cache, location_registry, model_routing
+from app.utils.admin import admin_required
+import logging
+
+# Initialize the Blueprint
+location_routes = Blueprint('location_routes', __name__)
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+@location_routes.route('/locations', methods=['GET'])
+def list_locations():
+    """Active locations, optionally filtered by account_id, brand or group."""
+    registry = location_registry.get_registry()
+    etag = http_cache.make_etag("locations", registry.version, request.query_string.decode())
+    if http_cache.is_not_modified(etag):
+        return http_cache.not_modified_response(etag)
+
+    locations = registry.filter(
+        account_id=request.args.get('account_id'),
+        brand=request.args.get('brand'),
+        group=request.args.get('group'),
+    )
+    return http_cache.cacheable(
+        jsonify({"version": registry.version, "locations": locations}), etag
+    )
+
+@location_routes.route('/locations', methods=['POST'])
+@admin_required
+def save_locations():
+    """Add or update locations; every worker reloads its registry."""
+    try:
+        locations = (request.get_json(silent=True) or {}).get('locations', [])
+        required = ("location_id", "account_id", "name")
+        if not locations or any(not all(location.get(key) for key in required) for location in locations):
+            return jsonify({"error": "Each location needs location_id, account_id and name"}), 400
+        if any(location.get("summary_mode") not in (None, *model_routing.MODES) for location in locations):
+            return jsonify({"error": f"summary_mode must be one of {', '.join(model_routing.MODES)}"}), 400
+        location_registry.save_locations(locations)
+        return jsonify({"saved": len(locations), "version": location_registry.get_registry().version})
+    except Exception as e:
+        logger.error(f"Exception occurred: {e}")
+        logger.exception("Exception details:")
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,83 @@
+from flask import Blueprint, Response, request, jsonify
+from app.config import settings
+from app.utils import profiling
+from app.utils.admin import admin_required
+import logging
+
+# Initialize the Blueprint
+profiling_routes = Blueprint('profiling_routes', __name__)
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Download format -> (mimetype, file extension)
+FORMATS = {
+    "collapsed": ("text/plain", "collapsed.txt"),
+    "speedscope": ("application/json", "speedscope.json"),
+    "text": ("text/plain", "txt"),
+    "pstats": ("application/octet-stream", "prof"),
+    "html": ("text/html", "html"),
+}
+
+
+def _download(data, name, fmt):
+    mimetype, extension = FORMATS[fmt]
+    return Response(
+        data,
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{name}.{extension}"'},
+    )
+
+
+@profiling_routes.route('/admin/profiles/<profile_id>', methods=['GET'])
+@admin_required
+def download_profile(profile_id):
+    """A per-request profile captured with the X-Profile header.
+
+    ?format= picks one of the formats listed in the capture's
+    X-Profile-Formats header; the default is the first of them.
+    """
+    fmt = request.args.get('format')
+    if fmt is not None and fmt not in FORMATS:
+        return jsonify({"error": f"Unknown format {fmt}"}), 400
+    fmt, data = profiling.load(profile_id, fmt)
+    if data is None:
+        return jsonify({"error": "Profile not found or not available in this format"}), 404
+    return _download(data, f"profile-{profile_id}", fmt)
+
+
+@profiling_routes.route('/admin/profiler', methods=['GET'])
+@admin_required
+def sampled_profile():
+    """Stacks aggregated by this worker's always-on sampler; ?reset=true starts over."""
+    if not settings.PROFILER_SAMPLING:
+        return jsonify({"error": "The sampling profiler is off; set PROFILER_SAMPLING=true"}), 409
+    fmt = request.args.get('format', 'speedscope')
+    if fmt not in ("collapsed", "speedscope"):
+        return jsonify({"error": "format must be collapsed or speedscope"}), 400
+    sampler = profiling.ensure_sampler()
+    stacks = sampler.snapshot(reset=request.args.get('reset') == 'true')
+    if fmt == "collapsed":
+        return _download(profiling.to_collapsed(stacks), "sampler", fmt)
+    return _download(profiling.to_speedscope(stacks, "sampler"), "sampler", fmt)
+
+
+@profiling_routes.route('/admin/tracemalloc', methods=['GET'])
+@admin_required
+def tracemalloc_snapshot():
+    """Top allocation sites of this worker and their growth since the last call."""
+    try:
+        limit = int(request.args.get('limit', 25))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    group_by = request.args.get('group_by', 'lineno')
+    if group_by not in ("lineno", "filename", "traceback"):
+        return jsonify({"error": "group_by must be lineno, filename or traceback"}), 400
+    return jsonify(profiling.tracemalloc_report(limit=limit, group_by=group_by))
+
+
+@profiling_routes.route('/admin/tracemalloc', methods=['DELETE'])
+@admin_required
+def stop_tracemalloc():
+    profiling.stop_tracemalloc()
+    return jsonify({"tracing": False})
@@ -0,0 +1,124 @@
+from flask import Blueprint, request, session, jsonify
+from app.models.reply import REPLY_STATUSES
+from app.utils import db_operations, jobs, reply_operations
+from app.utils.admin import admin_required, login_required
+import logging
+
+# Initialize the Blueprint
+reply_routes = Blueprint('reply_routes', __name__)
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+def _limit(value, default=500):
+    """`value` as a positive int (default when missing), or None if it is invalid."""
+    if value is None:
+        return default
+    if isinstance(value, (bool, float)):
+        return None
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return None
+    return limit if limit >= 1 else None
+
+@reply_routes.route('/replies', methods=['GET'])
+@login_required
+def list_replies():
+    """The reply approval queue, filtered by status and location."""
+    status = request.args.get('status')
+    if status and status not in REPLY_STATUSES:
+        return jsonify({"error": f"Unknown status: {status}"}), 400
+    limit = _limit(request.args.get('limit'))
+    if limit is None:
+        return jsonify({"error": "limit must be a positive integer"}), 400
+    try:
+        return jsonify(db_operations.list_replies(status, request.args.get('location_name'), limit))
+    except Exception as e:
+        logger.error(f"Exception occurred: {e}")
+        logger.exception("Exception details:")
+        return jsonify({"error": str(e)}), 500
+
+@reply_routes.route('/replies/draft', methods=['POST'])
+@login_required
+def draft_replies():
+    """Start drafting replies for unreplied reviews (optionally only `location_names`).
+
+    Hundreds of reviews take longer than a request may, so this returns 202
+    with a job id; GET /jobs/<id> reports {"queued": n} once done.
+    """
+    body = request.get_json(silent=True) or {}
+    limit = _limit(body.get('limit'))
+    if limit is None:
+        return jsonify({"error": "limit must be a positive integer"}), 400
+    location_names = body.get('location_names')
+    try:
+        job_id = jobs.submit(
+            "reply_draft",
+            lambda: {"queued": reply_operations.draft_replies(location_names, limit)},
+            dedupe_key=f"reply_draft:{','.join(sorted(location_names or []))}",
+        )
+        return jsonify({"job_id": job_id}), 202
+    except Exception as e:
+        logger.error(f"Exception occurred: {e}")
+        logger.exception("Exception details:")
+        return jsonify({"error": str(e)}), 500
+
+@reply_routes.route('/replies/approve', methods=['POST'])
+@admin_required
+def approve_replies():
+    """Approve drafts by review_ids; `edits` maps review_id to replacement text.
+
+    Admin only: whatever is approved here is published under the dealership's name.
+    """
+    try:
+        body = request.get_json(silent=True) or {}
+        review_ids = body.get('review_ids', [])
+        if not review_ids:
+            return jsonify({"error": "No review_ids provided"}), 400
+        approved = db_operations.update_reply_status(
+            review_ids, "approved", ("pending", "failed"), drafts=body.get('edits')
+        )
+        return jsonify({"approved": approved})
+    except Exception as e:
+        logger.error(f"Exception occurred: {e}")
+        logger.exception("Exception details:")
+        return jsonify({"error": str(e)}), 500
+
+@reply_routes.route('/replies/reject', methods=['POST'])
+@login_required
+def reject_replies():
+    try:
+        body = request.get_json(silent=True) or {}
+        review_ids = body.get('review_ids', [])
+        if not review_ids:
+            return jsonify({"error": "No review_ids provided"}), 400
+        rejected = db_operations.update_reply_status(review_ids, "rejected", ("pending", "approved", "failed"))
+        return jsonify({"rejected": rejected})
+    except Exception as e:
+        logger.error(f"Exception occurred: {e}")
+        logger.exception("Exception details:")
+        return jsonify({"error": str(e)}), 500
+
+@reply_routes.route('/replies/post', methods=['POST'])
+@login_required
+def post_replies():
+    """Start posting every approved reply to Google with the logged-in user's credentials.
+
+    Returns 202 with a job id; GET /jobs/<id> reports the posted, skipped
+    and failed counts once done. Only one posting run is queued at a time.
+    """
+    body = request.get_json(silent=True) or {}
+    limit = _limit(body.get('limit'))
+    if limit is None:
+        return jsonify({"error": "limit must be a positive integer"}), 400
+    try:
+        job_id = jobs.submit(
+            "reply_post", reply_operations.post_approved_replies, dict(session['credentials']), limit,
+            dedupe_key="reply_post",
+        )
+        return jsonify({"job_id": job_id}), 202
+    except Exception as e:
+        logger.error(f"Exception occurred: {e}")
+        logger.exception("Exception details:")
+        return jsonify({"error": str(e)}), 500
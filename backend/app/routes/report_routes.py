@@ -0,0 +1,52 @@
+from flask import Blueprint, request, jsonify, send_from_directory
+from app.config import settings
+import json
+import logging
+import os
+import re
+
+# Initialize the Blueprint
+report_routes = Blueprint('report_routes', __name__)
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+REPORT_MAX_AGE = 3600  # Seconds browsers may reuse a digest for a given week
+WEEK_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+def _week_dir(week):
+    """Directory of a week's digests, or of the latest run's index when week is None."""
+    reports_dir = os.path.abspath(settings.REPORTS_DIR)
+    return os.path.join(reports_dir, week) if week else reports_dir
+
+
+@report_routes.route('/reports', methods=['GET'])
+def list_reports():
+    """Index of the digests built for ?week= (a Monday), or for the latest week."""
+    week = request.args.get('week')
+    if week and not WEEK_PATTERN.match(week):
+        return jsonify({"error": "week must be a date like 2026-01-05"}), 400
+    # Served straight from disk; Flask answers If-None-Match / If-Modified-Since with 304
+    response = send_from_directory(_week_dir(week), "index.json", max_age=REPORT_MAX_AGE if week else 0)
+    response.cache_control.no_cache = not week
+    return response
+
+
+@report_routes.route('/reports/<slug>', methods=['GET'])
+def get_report(slug):
+    """A pre-rendered digest as HTML (default) or JSON (?format=json)."""
+    week = request.args.get('week')
+    if week and not WEEK_PATTERN.match(week):
+        return jsonify({"error": "week must be a date like 2026-01-05"}), 400
+    fmt = request.args.get('format', 'html')
+    if fmt not in ('html', 'json'):
+        return jsonify({"error": "format must be html or json"}), 400
+
+    if not week:
+        try:
+            with open(os.path.join(_week_dir(None), "index.json")) as f:
+                week = json.load(f)["week_start"]
+        except (OSError, ValueError, KeyError):
+            return jsonify({"error": "No reports have been generated yet"}), 404
+    return send_from_directory(_week_dir(week), f"{slug}.{fmt}", max_age=REPORT_MAX_AGE)
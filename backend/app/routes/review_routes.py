@@ -1,7 +1,10 @@
-from flask import Blueprint, request, jsonify
-from app.utils.openai_operations import get_completion
-from app.utils.redis_operations import redis_client
-import json
+from flask import Blueprint, request, session, jsonify, redirect, current_app
+from app.config import settings
+from app.utils import db_operations, google_api, http_cache, json_response, model_routing, review_sync, topic_operations
+from app.utils.redis_operations import store_reviews, load_reviews, load_reviews_version, load_summary
+from app.utils.summary_operations import generate_summary, summary_version
+from app.utils.location_registry import get_registry
+from app.utils.admin import login_required
 import logging
 
 # Initialize the Blueprint
@@ -10,32 +13,313 @@ review_routes = Blueprint('review_routes', __name__)
 # Initialize logger
 logger = logging.getLogger(__name__)
 
+def _reviews_etag(version):
+    return http_cache.make_etag(
+        "reviews", version, request.args.get('fields'), request.args.get('cursor'), request.args.get('limit')
+    )
+
+def _bad_request(message):
+    # A Response rather than a (body, status) tuple, so callers can still set headers
+    response = jsonify({"error": message})
+    response.status_code = 400
+    return response
+
+def _reviews_args_error():
+    """400 response for a malformed ?limit= or ?cursor=, else None."""
+    limit = request.args.get('limit', type=int)
+    if 'limit' in request.args and (limit is None or limit < 1):
+        return _bad_request("limit must be a positive integer")
+    if request.args.get('cursor'):
+        try:
+            json_response.decode_cursor(request.args['cursor'])
+        except ValueError as e:
+            return _bad_request(str(e))
+    return None
+
+def _reviews_response(reviews_json, version, reviews=None, max_age=0):
+    """Serve reviews honouring ?fields=, ?cursor= and ?limit=.
+
+    Without those the stored JSON bytes are sent as is; otherwise the page is
+    projected and encoded (streamed when large), and the next page's cursor
+    goes in X-Next-Cursor. Always returns a Response, 400 for bad arguments.
+    """
+    fields = request.args.get('fields')
+    cursor = request.args.get('cursor')
+    limit = request.args.get('limit', type=int)
+    error = _reviews_args_error()
+    if error is not None:
+        return error
+
+    etag = _reviews_etag(version)
+    if http_cache.is_not_modified(etag):
+        return http_cache.not_modified_response(etag, max_age)
+
+    if not (fields or cursor or limit):
+        response = current_app.response_class(reviews_json, mimetype="application/json")
+        return http_cache.cacheable(response, etag, max_age)
+
+    if reviews is None:
+        reviews = json_response.loads(reviews_json)
+    try:
+        page, next_cursor = json_response.paginate(reviews, cursor, limit)
+    except ValueError as e:
+        return _bad_request(str(e))
+    if fields:
+        wanted = [field.strip() for field in fields.split(',') if field.strip()]
+        page = [json_response.project(review, wanted) for review in page]
+
+    response = json_response.array_response(page)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return http_cache.cacheable(response, etag, max_age)
+
+@review_routes.route('/fetch_reviews', methods=['GET'])
+def fetch_reviews():
+    try:
+        location_name = request.args.get('location_name')
+        logger.debug(f"Received location_name: {location_name}")
+        location = get_registry().find(name=location_name) if location_name else None
+        if location is None:
+            return jsonify({"error": "Invalid location name"}), 400
+
+        location_name = location["name"]
+
+        if 'credentials' not in session:
+            logger.debug("Credentials not found in session")
+            return redirect('authorize')
+
+        # Checked before calling Google, so a bad request costs no upstream call
+        error = _reviews_args_error()
+        if error is not None:
+            return error
+
+        # A revalidation within REVIEWS_MAX_AGE of the last sync is answered
+        # from the stored version, without calling Google or the database
+        version, age = load_reviews_version(location_name)
+        if version is not None and age < settings.REVIEWS_MAX_AGE:
+            etag = _reviews_etag(version)
+            if http_cache.is_not_modified(etag):
+                return http_cache.not_modified_response(etag, settings.REVIEWS_MAX_AGE)
+
+        try:
+            credentials = google_api.credentials_from_dict(session['credentials'])
+            service = google_api.build_service(credentials)
+            response = review_sync.list_reviews(service, location)
+        except Exception as e:
+            # Google is down or slow: serve the last synced copy if there is one
+            reviews_json, version = load_reviews(location_name)
+            if reviews_json is None:
+                raise
+            logger.warning(f"Serving cached reviews for {location_name}: {e}")
+            response = _reviews_response(reviews_json, version)
+            response.headers["X-Served-From"] = "cache"
+            return response
+
+        reviews = response.get('reviews', [])
+        logger.debug(f"Google API returned {len(reviews)} reviews")
+        # Encoded once: the same bytes are stored in Redis (for 2hrs) and sent
+        reviews_json = json_response.dumps(reviews)
+        version = store_reviews(location_name, reviews_json)
+        if credentials.token != session['credentials']['token']:
+            # Only write the session back when the token was refreshed
+            session['credentials'] = google_api.credentials_to_dict(credentials)
+        try:
+            # Only the page already fetched is indexed here; older pages (and a
+            # first sync's full history) are walked by a background job
+            _, done = review_sync.index_reviews(service, location, response, max_pages=1)
+            if not done:
+                review_sync.sync_in_background(session['credentials'], location, response.get('nextPageToken'))
+        except Exception as e:
+            # Search and history fall behind until the next sync; the reviews are still served
+            logger.error(f"Failed to index reviews for {location_name}: {e}")
+
+        return _reviews_response(reviews_json, version, reviews, settings.REVIEWS_MAX_AGE)
+
+    except Exception as e:
+        logger.error(f"Exception occurred: {e}")
+        logger.exception("Exception details:")
+        return jsonify({"error": str(e)}), 500
+
+@review_routes.route('/search_reviews', methods=['GET'])
+def search_reviews():
+    """Search stored reviews across locations, filtered and paginated."""
+    try:
+        min_rating = request.args.get('min_rating', type=int)
+        max_rating = request.args.get('max_rating', type=int)
+        page = max(request.args.get('page', 1, type=int), 1)
+        page_size = min(max(request.args.get('page_size', 20, type=int), 1), 100)
+
+        results, has_more = db_operations.search_reviews(
+            query=request.args.get('q'),
+            location_name=request.args.get('location_name'),
+            min_rating=min_rating,
+            max_rating=max_rating,
+            since=request.args.get('since'),
+            until=request.args.get('until'),
+            page=page,
+            page_size=page_size,
+        )
+        return jsonify({"results": results, "page": page, "page_size": page_size, "has_more": has_more})
+
+    except Exception as e:
+        logger.error(f"Exception occurred: {e}")
+        logger.exception("Exception details:")
+        return jsonify({"error": str(e)}), 500
+
+@review_routes.route('/trends', methods=['GET'])
+def get_trends():
+    """Per-day or per-week rollups plus daily snapshots for a location."""
+    try:
+        location = get_registry().find(name=request.args.get('location_name'))
+        if location is None:
+            return jsonify({"error": "Invalid location name"}), 400
+        period = request.args.get('period', 'day')
+        if period not in ('day', 'week'):
+            return jsonify({"error": "period must be 'day' or 'week'"}), 400
+
+        rollups, snapshots = db_operations.fetch_trends(
+            location["location_id"],
+            period=period,
+            since=request.args.get('since'),
+            until=request.args.get('until'),
+        )
+        return jsonify({"location_name": location["name"], "period": period,
+                        "rollups": rollups, "snapshots": snapshots})
+
+    except Exception as e:
+        logger.error(f"Exception occurred: {e}")
+        logger.exception("Exception details:")
+        return jsonify({"error": str(e)}), 500
+
+@review_routes.route('/topics', methods=['GET'])
+@login_required
+def get_topics():
+    """Topic clusters for a location's stored reviews."""
+    try:
+        location_name = request.args.get('location_name')
+        if not location_name:
+            return jsonify({"error": "No location_name provided"}), 400
+        location = get_registry().find(name=location_name)
+        if location is None:
+            return jsonify({"error": "Invalid location name"}), 400
+        topics = topic_operations.location_topics(location)
+        if topics is None:
+            return jsonify({"error": "No reviews found for the given location, please fetch them first"}), 400
+        return jsonify(topics)
+
+    except Exception as e:
+        logger.error(f"Exception occurred: {e}")
+        logger.exception("Exception details:")
+        return jsonify({"error": str(e)}), 500
+
+@review_routes.route('/similar_reviews', methods=['GET'])
+@login_required
+def get_similar_reviews():
+    """Reviews similar to a stored review (review_id) or to free text (q)."""
+    try:
+        location_name = request.args.get('location_name')
+        review_id = request.args.get('review_id')
+        text = request.args.get('q')
+        if not location_name or not (review_id or text):
+            return jsonify({"error": "location_name and one of review_id or q are required"}), 400
+        location = get_registry().find(name=location_name)
+        if location is None:
+            return jsonify({"error": "Invalid location name"}), 400
+        k = min(max(request.args.get('k', 5, type=int), 1), 50)
+
+        matches = topic_operations.similar_reviews(location, review_id=review_id, text=text, k=k)
+        return jsonify([{"review": review, "score": score} for review, score in matches])
+
+    except Exception as e:
+        logger.error(f"Exception occurred: {e}")
+        logger.exception("Exception details:")
+        return jsonify({"error": str(e)}), 500
+
+@review_routes.route('/summary', methods=['GET'])
+def get_summary():
+    """Serve a precomputed summary artifact; never calls the LLM.
+
+    Without ?version= this is the summary of the currently stored reviews in
+    ?mode= (else the location's default mode); a 404 means it has not been
+    generated yet, so the client should POST /summarize_reviews.
+    """
+    location_name = request.args.get('location_name')
+    if not location_name:
+        return jsonify({"error": "No location_name provided"}), 400
+    location = get_registry().find(name=location_name)
+    if location is None:
+        return jsonify({"error": "Invalid location name"}), 400
+    location_name = location["name"]
+    version = request.args.get('version')
+
+    if version:
+        artifact = load_summary(location_name, version)
+    else:
+        mode = request.args.get('mode')
+        if mode and mode not in model_routing.MODES:
+            return jsonify({"error": f"mode must be one of {', '.join(model_routing.MODES)}"}), 400
+        reviews_version, _ = load_reviews_version(location_name)
+        if reviews_version is None:
+            return jsonify({"error": "No reviews found for the given location, please fetch them first"}), 404
+        current = summary_version(reviews_version, model_routing.resolve_mode(mode, location))
+        artifact = load_summary(location_name, current)
+    if artifact is None:
+        return jsonify({"error": "No summary generated for this location and version"}), 404
+
+    # A versioned URL always names the same artifact, so it can be cached for
+    # good; the unversioned one points at the latest and must be revalidated.
+    max_age = settings.SUMMARY_TTL if version else 0
+    etag = http_cache.make_etag("summary", artifact["version"])
+    if http_cache.is_not_modified(etag):
+        return http_cache.not_modified_response(etag, max_age)
+    response = http_cache.cacheable(jsonify(artifact), etag, max_age)
+    if version:
+        response.cache_control.immutable = True
+    return response
+
 @review_routes.route('/summarize_reviews', methods=['POST'])
 def summarize_reviews():
+    """Explicitly generate (or reuse) the summary artifact for the stored reviews."""
     try:
         location_name = request.json.get('location_name', None)
         if not location_name:
             return jsonify({"error": "No location_name provided"}), 400
+        location = get_registry().find(name=location_name)
+        if location is None:
+            return jsonify({"error": "Invalid location name"}), 400
+        location_name = location["name"]
+        mode = request.json.get('mode')
+        if mode and mode not in model_routing.MODES:
+            return jsonify({"error": f"mode must be one of {', '.join(model_routing.MODES)}"}), 400
 
-        # Fetch reviews from Redis based on location_name
-        redis_key = f"reviews_{location_name}"
-        reviews_json = redis_client.get(redis_key)
-
-        if reviews_json is None:
+        try:
+            artifact = generate_summary(location_name, mode)
+        except Exception as e:
+            # OpenAI is down or slow: fall back to the last generated summary
+            artifact = load_summary(location_name)
+            if artifact is None:
+                raise
+            logger.warning(f"Serving stored summary for {location_name}: {e}")
+            return jsonify({**artifact, "stale": True})
+        if artifact is None:
             return jsonify({"error": "No reviews found for the given location, please fetch them first"}), 400
 
-        reviews = json.loads(reviews_json)
+        return jsonify(artifact)
 
-        summaries = []
-        for review in reviews:
-            comment = review.get('comment', '')
-            prompt = f"Your task is to summarize the following review in 20 words: ```{comment}```"
-            summary = get_completion(prompt)
-            logger.debug(f"Generated Summary: {summary}")  # Debugging line
-            summaries.append(summary)
-
-        return jsonify({"summary": " ".join(summaries)})
+    except Exception as e:
+        logger.error(f"Exception occurred: {e}")
+        logger.exception("Exception details:")
+        return jsonify({"error": str(e)}), 500
 
+@review_routes.route('/summary_modes', methods=['GET'])
+def summary_modes():
+    """Available summary modes with their recorded latency and cost."""
+    try:
+        return jsonify({
+            "default": settings.SUMMARY_MODE,
+            "modes": model_routing.MODES,
+            "metrics": model_routing.mode_metrics(),
+        })
     except Exception as e:
         logger.error(f"Exception occurred: {e}")
         logger.exception("Exception details:")
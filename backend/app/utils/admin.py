@@ -0,0 +1,28 @@
+# app/utils/admin.py
+import hmac
+from functools import wraps
+from flask import request, jsonify, session
+from app.config import settings
+
+def is_admin():
+    """True when the request carries the configured X-Admin-Token."""
+    token = request.headers.get("X-Admin-Token", "")
+    return bool(settings.ADMIN_TOKEN) and hmac.compare_digest(token, settings.ADMIN_TOKEN)
+
+def admin_required(view):
+    """Reject the request with 403 unless is_admin()."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not is_admin():
+            return jsonify({"error": "Admin token required"}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+def login_required(view):
+    """Reject the request with 401 unless the session holds Google credentials."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if 'credentials' not in session:
+            return jsonify({"error": "Not authenticated"}), 401
+        return view(*args, **kwargs)
+    return wrapper
@@ -1,18 +1,541 @@
 # app/utils/db_operations.py
 import os
-import psycopg2
 import json
+import threading
+from collections import defaultdict
+from datetime import date
+from contextlib import contextmanager
 from app.config import settings
+from app.models.location import LOCATIONS_TABLE, LOCATION_COLUMNS
+from app.models.reply import REPLIES_TABLE
+from app.models.review import REVIEWS_TABLE, REVIEW_COLUMNS, REVIEW_SYNC_TABLE, review_row
+from app.models.snapshot import (
+    ROLLUPS_TABLE, ROLLUP_PERIODS, SNAPSHOTS_TABLE, STAT_AGGREGATES, STAT_COLUMNS, partition_ddl,
+)
+from app.utils.startup import lazy_import
+
+# Shared connection pool and schema flag, set up on first use
+_pool = None
+# ThreadedConnectionPool raises PoolError when exhausted; this makes callers queue instead
+_pool_slots = threading.BoundedSemaphore(settings.DB_POOL_SIZE)
+_schema_ready = False
+_partitions = set()
 
 def connect_to_db():
     """Connect to PostgreSQL database."""
+    psycopg2 = lazy_import("psycopg2")
     conn = psycopg2.connect(
         host=settings.DB_HOST,
         database=settings.DB_NAME,
         user=settings.DB_USER,
         password=settings.DB_PASSWORD,
-        port=settings.DB_PORT
+        port=settings.DB_PORT,
+        connect_timeout=settings.DB_CONNECT_TIMEOUT,
+        options=f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT * 1000}",
     )
     return conn
 
-# ... (the rest of your DB operations)
+@contextmanager
+def get_connection():
+    """Borrow a pooled connection; commits on success, rolls back on error.
+
+    When all DB_POOL_SIZE connections are out this waits up to DB_POOL_WAIT
+    seconds for one to come back, then raises PoolError.
+    """
+    global _pool
+    pool = lazy_import("psycopg2.pool")
+    if not _pool_slots.acquire(timeout=settings.DB_POOL_WAIT):
+        raise pool.PoolError(f"No database connection free after {settings.DB_POOL_WAIT}s")
+    try:
+        if _pool is None:
+            _pool = pool.ThreadedConnectionPool(
+                1,
+                settings.DB_POOL_SIZE,
+                host=settings.DB_HOST,
+                database=settings.DB_NAME,
+                user=settings.DB_USER,
+                password=settings.DB_PASSWORD,
+                port=settings.DB_PORT,
+                # A stalled database fails requests instead of hanging them
+                connect_timeout=settings.DB_CONNECT_TIMEOUT,
+                options=f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT * 1000}",
+            )
+        conn = _pool.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            _pool.putconn(conn)
+    finally:
+        _pool_slots.release()
+
+def ensure_schema():
+    """Create the tables and indexes once per process."""
+    global _schema_ready
+    if _schema_ready:
+        return
+    with get_connection() as conn, conn.cursor() as cur:
+        cur.execute(LOCATIONS_TABLE)
+        cur.execute(REVIEWS_TABLE)
+        cur.execute(REVIEW_SYNC_TABLE)
+        cur.execute(REPLIES_TABLE)
+        cur.execute(SNAPSHOTS_TABLE)
+        cur.execute(ROLLUPS_TABLE)
+    _schema_ready = True
+
+def upsert_reviews(location_name, account_id, location_id, reviews):
+    """Index a location's reviews for search; returns the ids that changed.
+
+    Rows whose update_time and reply are unchanged are skipped, so re-syncing
+    a location only rewrites (and re-indexes) reviews that are new or edited.
+    """
+    if not reviews:
+        return []
+    ensure_schema()
+    extras = lazy_import("psycopg2.extras")
+    rows = [review_row(location_name, account_id, location_id, review) for review in reviews]
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in REVIEW_COLUMNS[1:])
+    with get_connection() as conn, conn.cursor() as cur:
+        changed = extras.execute_values(
+            cur,
+            f"""
+            INSERT INTO reviews ({", ".join(REVIEW_COLUMNS)}) VALUES %s
+            ON CONFLICT (review_id) DO UPDATE SET {updates}
+            WHERE reviews.update_time IS DISTINCT FROM EXCLUDED.update_time
+               OR reviews.reply_comment IS DISTINCT FROM EXCLUDED.reply_comment
+            RETURNING review_id
+            """,
+            rows,
+            fetch=True,
+        )
+    return [review_id for (review_id,) in changed]
+
+def location_reviews_version(location_id):
+    """Version of a location's stored reviews: row count plus latest update_time, or None if none."""
+    ensure_schema()
+    with get_connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            "SELECT count(*), max(update_time) FROM reviews WHERE location_id = %s",
+            (location_id,),
+        )
+        count, updated = cur.fetchone()
+    return f"{count}:{updated.isoformat() if updated else ''}" if count else None
+
+def fetch_location_reviews(location_id):
+    """Every stored review of a location with a comment, as Google returned it."""
+    ensure_schema()
+    with get_connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT raw FROM reviews
+            WHERE location_id = %s AND coalesce(comment, '') <> ''
+            ORDER BY update_time DESC NULLS LAST
+            """,
+            (location_id,),
+        )
+        return [row[0] for row in cur.fetchall()]
+
+def load_sync_state(location_id):
+    """(history_complete, page_token) of a location's backfill; (False, None) before the first."""
+    ensure_schema()
+    with get_connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            "SELECT history_complete, page_token FROM review_sync_state WHERE location_id = %s",
+            (location_id,),
+        )
+        row = cur.fetchone()
+    return (row[0], row[1]) if row else (False, None)
+
+def save_sync_state(location_id, page_token, history_complete=False):
+    ensure_schema()
+    with get_connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO review_sync_state (location_id, page_token, history_complete)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (location_id) DO UPDATE SET page_token = EXCLUDED.page_token,
+                history_complete = EXCLUDED.history_complete, updated_at = now()
+            """,
+            (location_id, page_token, history_complete),
+        )
+
+def search_reviews(query=None, location_name=None, min_rating=None, max_rating=None,
+                   since=None, until=None, page=1, page_size=20):
+    """Full-text search over stored reviews with optional filters.
+
+    Returns (results, has_more). Matches are ranked by relevance, then recency;
+    without a query the filtered reviews are listed newest first.
+    """
+    ensure_schema()
+    conditions = []
+    params = {"limit": page_size + 1, "offset": (page - 1) * page_size}
+    if query:
+        conditions.append("search @@ websearch_to_tsquery('english', %(query)s)")
+        params["query"] = query
+    if location_name:
+        conditions.append("location_name = %(location_name)s")
+        params["location_name"] = location_name
+    if min_rating is not None:
+        conditions.append("star_rating >= %(min_rating)s")
+        params["min_rating"] = min_rating
+    if max_rating is not None:
+        conditions.append("star_rating <= %(max_rating)s")
+        params["max_rating"] = max_rating
+    if since:
+        conditions.append("create_time >= %(since)s")
+        params["since"] = since
+    if until:
+        conditions.append("create_time < %(until)s")
+        params["until"] = until
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    if query:
+        rank = "ts_rank(search, websearch_to_tsquery('english', %(query)s))"
+        order = f"{rank} DESC, create_time DESC"
+    else:
+        order = "create_time DESC"
+
+    with get_connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            f"""
+            SELECT review_id, location_name, reviewer_name, star_rating, comment,
+                   reply_comment, create_time
+            FROM reviews {where}
+            ORDER BY {order}
+            LIMIT %(limit)s OFFSET %(offset)s
+            """,
+            params,
+        )
+        columns = [description[0] for description in cur.description]
+        rows = cur.fetchall()
+
+    results = [dict(zip(columns, row)) for row in rows[:page_size]]
+    for result in results:
+        if result["create_time"] is not None:
+            result["create_time"] = result["create_time"].isoformat()
+    return results, len(rows) > page_size
+
+def _rows_as_dicts(cur):
+    columns = [description[0] for description in cur.description]
+    return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+def fetch_unreplied_reviews(location_names=None, limit=500):
+    """Stored reviews with no reply on Google and no draft queued yet."""
+    ensure_schema()
+    location_filter = "AND r.location_name = ANY(%(location_names)s)" if location_names else ""
+    with get_connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            f"""
+            SELECT r.review_id, r.location_name, r.reviewer_name, r.star_rating, r.comment
+            FROM reviews r
+            LEFT JOIN review_replies q ON q.review_id = r.review_id
+            WHERE r.reply_comment IS NULL AND q.review_id IS NULL {location_filter}
+            ORDER BY r.create_time DESC
+            LIMIT %(limit)s
+            """,
+            {"location_names": location_names, "limit": limit},
+        )
+        return _rows_as_dicts(cur)
+
+def queue_reply_drafts(drafts):
+    """Queue (review_id, location_name, draft) tuples for approval."""
+    if not drafts:
+        return
+    ensure_schema()
+    extras = lazy_import("psycopg2.extras")
+    with get_connection() as conn, conn.cursor() as cur:
+        extras.execute_values(
+            cur,
+            """
+            INSERT INTO review_replies (review_id, location_name, draft) VALUES %s
+            ON CONFLICT (review_id) DO NOTHING
+            """,
+            drafts,
+        )
+
+def list_replies(status=None, location_name=None, limit=500):
+    """Queued replies, optionally filtered by status and location."""
+    ensure_schema()
+    conditions = []
+    params = {"limit": limit}
+    if status:
+        conditions.append("status = %(status)s")
+        params["status"] = status
+    if location_name:
+        conditions.append("location_name = %(location_name)s")
+        params["location_name"] = location_name
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    with get_connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            f"""
+            SELECT review_id, location_name, draft, status, error, created_at, posted_at
+            FROM review_replies {where}
+            ORDER BY created_at
+            LIMIT %(limit)s
+            """,
+            params,
+        )
+        replies = _rows_as_dicts(cur)
+    for reply in replies:
+        for column in ("created_at", "posted_at"):
+            if reply[column] is not None:
+                reply[column] = reply[column].isoformat()
+    return replies
+
+def update_reply_status(review_ids, status, from_statuses, drafts=None):
+    """Move replies to `status` if they are currently in one of `from_statuses`.
+
+    `drafts` optionally maps review_id to edited reply text. Returns the
+    number of replies updated.
+    """
+    ensure_schema()
+    drafts = drafts or {}
+    updated = 0
+    with get_connection() as conn, conn.cursor() as cur:
+        for review_id in review_ids:
+            cur.execute(
+                """
+                UPDATE review_replies
+                SET status = %s, draft = COALESCE(%s, draft), error = NULL, updated_at = now()
+                WHERE review_id = %s AND status = ANY(%s)
+                """,
+                (status, drafts.get(review_id), review_id, list(from_statuses)),
+            )
+            updated += cur.rowcount
+    return updated
+
+def claim_approved_replies(limit=500):
+    """Atomically mark approved replies as posting and return them.
+
+    Replies stuck in posting for REPLY_POSTING_TIMEOUT seconds (their run
+    crashed) are claimed again. SKIP LOCKED lets concurrent posting runs
+    split the queue instead of sending the same reply twice.
+    """
+    ensure_schema()
+    with get_connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            UPDATE review_replies q
+            SET status = 'posting',
+                idempotency_key = encode(sha256(convert_to(q.review_id || '|' || q.draft, 'UTF8')), 'hex'),
+                updated_at = now()
+            FROM reviews r
+            WHERE r.review_id = q.review_id AND q.review_id IN (
+                SELECT review_id FROM review_replies
+                WHERE status = 'approved'
+                   OR (status = 'posting' AND updated_at < now() - make_interval(secs => %s))
+                ORDER BY created_at
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING q.review_id, q.location_name, q.draft, q.idempotency_key, q.posted_key,
+                      r.account_id, r.location_id
+            """,
+            (settings.REPLY_POSTING_TIMEOUT, limit),
+        )
+        return _rows_as_dicts(cur)
+
+def mark_reply_sending(review_id, idempotency_key):
+    """Record which text is about to be sent to Google, before sending it."""
+    with get_connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            "UPDATE review_replies SET posted_key = %s, updated_at = now() WHERE review_id = %s",
+            (idempotency_key, review_id),
+        )
+
+def finish_reply(review_id, idempotency_key, error=None):
+    """Record the outcome of posting a claimed reply."""
+    with get_connection() as conn, conn.cursor() as cur:
+        if error is None:
+            cur.execute(
+                """
+                UPDATE review_replies
+                SET status = 'posted', posted_key = %s, error = NULL, posted_at = now(), updated_at = now()
+                WHERE review_id = %s
+                """,
+                (idempotency_key, review_id),
+            )
+            cur.execute(
+                """
+                UPDATE reviews SET reply_comment = q.draft
+                FROM review_replies q
+                WHERE q.review_id = reviews.review_id AND reviews.review_id = %s
+                """,
+                (review_id,),
+            )
+        else:
+            cur.execute(
+                "UPDATE review_replies SET status = 'failed', error = %s, updated_at = now() WHERE review_id = %s",
+                (error, review_id),
+            )
+
+def fetch_locations():
+    """Every location row as a dict."""
+    ensure_schema()
+    with get_connection() as conn, conn.cursor() as cur:
+        cur.execute(f"SELECT {', '.join(LOCATION_COLUMNS)} FROM locations ORDER BY name")
+        return _rows_as_dicts(cur)
+
+def upsert_locations(locations):
+    """Insert or update location dicts keyed by location_id.
+
+    Only the columns present in a dict are written, so an update that omits
+    brand, group_name or summary_mode leaves the stored values alone.
+    """
+    if not locations:
+        return
+    ensure_schema()
+    extras = lazy_import("psycopg2.extras")
+    # execute_values needs one column list per statement
+    groups = defaultdict(list)
+    for location in locations:
+        columns = tuple(column for column in LOCATION_COLUMNS if column in location)
+        groups[columns].append(tuple(location[column] for column in columns))
+    with get_connection() as conn, conn.cursor() as cur:
+        for columns, rows in groups.items():
+            updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in columns if column != "location_id")
+            extras.execute_values(
+                cur,
+                f"""
+                INSERT INTO locations ({", ".join(columns)}) VALUES %s
+                ON CONFLICT (location_id) DO UPDATE SET {updates}, updated_at = now()
+                """,
+                rows,
+            )
+
+def _stats(row):
+    """STAT_COLUMNS dict for a row, plus the average rating."""
+    stats = dict(zip(STAT_COLUMNS, row))
+    count = stats["review_count"]
+    stats["average_rating"] = round(stats["rating_sum"] / count, 2) if count else None
+    return stats
+
+def _ensure_partition(cur, day):
+    """Create the month's snapshot partition if needed; returns the month to
+    remember once the transaction commits (None if already known)."""
+    month_start = day.replace(day=1)
+    if month_start in _partitions:
+        return None
+    cur.execute(partition_ddl(month_start))
+    return month_start
+
+def record_history(location_id, changed_review_ids, totals=None):
+    """Snapshot a location's current state and refresh the rollups a sync touched.
+
+    `totals` carries Google's own totalReviewCount and averageRating from the
+    list response; they are stored next to the aggregates over local rows,
+    which only match once every page has been indexed. Without `totals`
+    today's snapshot keeps the ones it already has. Only the day and week
+    rollups containing changed reviews are recomputed, each from an index
+    range scan over just that period.
+    """
+    ensure_schema()
+    totals = totals or {}
+    stat_columns = ", ".join(STAT_COLUMNS)
+    stat_updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in STAT_COLUMNS)
+    params = {"location_id": location_id, "tz": settings.REPORT_TIMEZONE, "review_ids": changed_review_ids}
+    with get_connection() as conn, conn.cursor() as cur:
+        cur.execute("SELECT (now() AT TIME ZONE %s)::date", (settings.REPORT_TIMEZONE,))
+        today = cur.fetchone()[0]
+        new_partition = _ensure_partition(cur, today)
+        cur.execute(
+            f"""
+            INSERT INTO review_snapshots (location_id, snapshot_date, {stat_columns},
+                                          google_review_count, google_average_rating)
+            SELECT %(location_id)s, %(today)s, {STAT_AGGREGATES}, %(google_count)s, %(google_rating)s
+            FROM reviews r WHERE r.location_id = %(location_id)s
+            ON CONFLICT (location_id, snapshot_date) DO UPDATE SET {stat_updates},
+                google_review_count = COALESCE(EXCLUDED.google_review_count,
+                                               review_snapshots.google_review_count),
+                google_average_rating = COALESCE(EXCLUDED.google_average_rating,
+                                                 review_snapshots.google_average_rating),
+                taken_at = now()
+            """,
+            {
+                **params,
+                "today": today,
+                "google_count": totals.get("totalReviewCount"),
+                "google_rating": totals.get("averageRating"),
+            },
+        )
+        for period in ROLLUP_PERIODS if changed_review_ids else ():
+            cur.execute(
+                f"""
+                WITH affected AS (
+                    SELECT DISTINCT date_trunc(%(period)s, create_time AT TIME ZONE %(tz)s) AS period_start
+                    FROM reviews WHERE review_id = ANY(%(review_ids)s) AND create_time IS NOT NULL
+                )
+                INSERT INTO review_rollups (location_id, period, period_start, {stat_columns})
+                SELECT %(location_id)s, %(period)s, a.period_start::date, {STAT_AGGREGATES}
+                FROM affected a
+                JOIN reviews r
+                  ON r.location_id = %(location_id)s
+                 AND r.create_time >= a.period_start AT TIME ZONE %(tz)s
+                 AND r.create_time < (a.period_start + ('1 ' || %(period)s)::interval) AT TIME ZONE %(tz)s
+                GROUP BY a.period_start
+                ON CONFLICT (location_id, period, period_start) DO UPDATE SET {stat_updates}
+                """,
+                {**params, "period": period},
+            )
+    # Only trust the partition exists once its DDL has committed
+    if new_partition is not None:
+        _partitions.add(new_partition)
+
+def last_synced(location_id):
+    """When record_history last ran for a location (its latest snapshot), or None."""
+    ensure_schema()
+    with get_connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT taken_at FROM review_snapshots
+            WHERE location_id = %s ORDER BY snapshot_date DESC LIMIT 1
+            """,
+            (location_id,),
+        )
+        row = cur.fetchone()
+    return row[0] if row else None
+
+def fetch_trends(location_id, period="day", since=None, until=None):
+    """Rollups (reviews created per period) and daily snapshots for a location."""
+    ensure_schema()
+    stat_columns = ", ".join(STAT_COLUMNS)
+    params = {
+        "location_id": location_id,
+        "period": period,
+        "since": since or date.min,
+        "until": until or date.max,
+    }
+    with get_connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            f"""
+            SELECT period_start, {stat_columns} FROM review_rollups
+            WHERE location_id = %(location_id)s AND period = %(period)s
+              AND period_start >= %(since)s AND period_start < %(until)s
+            ORDER BY period_start
+            """,
+            params,
+        )
+        rollups = [{"period_start": row[0].isoformat(), **_stats(row[1:])} for row in cur.fetchall()]
+        cur.execute(
+            f"""
+            SELECT snapshot_date, google_review_count, google_average_rating, {stat_columns}
+            FROM review_snapshots
+            WHERE location_id = %(location_id)s
+              AND snapshot_date >= %(since)s AND snapshot_date < %(until)s
+            ORDER BY snapshot_date
+            """,
+            params,
+        )
+        snapshots = [
+            {
+                "date": row[0].isoformat(),
+                "google_review_count": row[1],
+                "google_average_rating": float(row[2]) if row[2] is not None else None,
+                **_stats(row[3:]),
+            }
+            for row in cur.fetchall()
+        ]
+    return rollups, snapshots
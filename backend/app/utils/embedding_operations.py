@@ -0,0 +1,79 @@
+# app/utils/embedding_operations.py
+import hashlib
+import math
+import re
+import zlib
+from collections import Counter
+from app.config import settings
+from app.utils.openai_operations import get_embeddings
+from app.utils.redis_operations import get_redis
+from app.utils.startup import lazy_import
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+HASHING_DIM = 512
+EMBEDDING_TTL = 30 * 24 * 3600  # Seconds a cached embedding is kept
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+def hashing_embed(texts):
+    """Offline fallback: hashed unigram/bigram counts, log-scaled.
+
+    crc32 is used instead of hash() so vectors are stable across processes
+    and can be cached.
+    """
+    np = lazy_import("numpy")
+    vectors = np.zeros((len(texts), HASHING_DIM), dtype=np.float32)
+    for row, text in enumerate(texts):
+        tokens = tokenize(text)
+        features = Counter(tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])])
+        for feature, count in features.items():
+            bucket = zlib.crc32(feature.encode())
+            sign = 1.0 if bucket & 0x80000000 else -1.0
+            vectors[row, bucket % HASHING_DIM] += sign * (1.0 + math.log(count))
+    return vectors
+
+def openai_embed(texts):
+    np = lazy_import("numpy")
+    return np.asarray(get_embeddings(texts), dtype=np.float32)
+
+PROVIDERS = {
+    "openai": openai_embed,
+    "hashing": hashing_embed,
+}
+
+def embed(texts, provider=None):
+    """Embed texts as L2-normalized rows, reusing cached vectors by content hash.
+
+    Only texts missing from the cache are sent to the provider, in batches of
+    EMBEDDING_BATCH_SIZE.
+    """
+    np = lazy_import("numpy")
+    provider = provider or settings.EMBEDDING_PROVIDER
+    embed_batch = PROVIDERS[provider]
+    keys = [f"embedding:{provider}:{hashlib.sha1(text.encode()).hexdigest()}" for text in texts]
+
+    redis_client = get_redis()
+    cached = redis_client.mget(keys) if keys else []
+    vectors = [np.frombuffer(value, dtype=np.float32) if value is not None else None for value in cached]
+
+    missing = {}
+    for i, vector in enumerate(vectors):
+        if vector is None:
+            missing.setdefault(keys[i], []).append(i)
+    missing_keys = list(missing)
+    for start in range(0, len(missing_keys), settings.EMBEDDING_BATCH_SIZE):
+        batch_keys = missing_keys[start:start + settings.EMBEDDING_BATCH_SIZE]
+        batch = embed_batch([texts[missing[key][0]] for key in batch_keys])
+        pipe = redis_client.pipeline()
+        for key, vector in zip(batch_keys, batch):
+            pipe.setex(key, EMBEDDING_TTL, vector.tobytes())
+            for i in missing[key]:
+                vectors[i] = vector
+        pipe.execute()
+
+    if not vectors:
+        return np.zeros((0, 0), dtype=np.float32)
+    matrix = np.vstack(vectors)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
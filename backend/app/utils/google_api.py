@@ -1,5 +1,70 @@
 # app/utils/google_api.py
+import os
+from datetime import datetime
+from functools import partial
 from app.config import settings
+from app.utils import resilience
+from app.utils.startup import lazy_import
+
+DISCOVERY_DOC_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "..", "mybusiness_google_rest_v4p9.json"
+)
+
+# Discovery document, read from disk once per process
+_discovery_doc = None
 
 def load_google_api_config():
     return settings.SCOPES, settings.API_SERVICE_NAME, settings.API_VERSION
+
+def credentials_to_dict(credentials):
+    """Session form of OAuth credentials: only the per-user tokens.
+
+    The client id, secret, token URI and scopes are the same for every user
+    and are filled back in from settings by credentials_from_dict().
+    """
+    return {
+        "token": credentials.token,
+        "refresh_token": credentials.refresh_token,
+        "expiry": credentials.expiry.isoformat() if credentials.expiry else None,
+    }
+
+def credentials_from_dict(credentials_dict):
+    """Build OAuth credentials from the session dict, refreshing if expired."""
+    expiry = credentials_dict.get("expiry")
+    credentials = lazy_import("google.oauth2.credentials").Credentials(
+        token=credentials_dict["token"],
+        refresh_token=credentials_dict.get("refresh_token"),
+        token_uri=credentials_dict.get("token_uri", settings.TOKEN_URI),
+        client_id=credentials_dict.get("client_id", settings.CLIENT_ID),
+        client_secret=credentials_dict.get("client_secret", settings.CLIENT_SECRET),
+        scopes=credentials_dict.get("scopes", settings.SCOPES),
+        expiry=datetime.fromisoformat(expiry) if expiry else None,
+    )
+    # No token at all (e.g. one built from a stored refresh token) needs a refresh too
+    if credentials.expired or not credentials.token:
+        transport = lazy_import("google.auth.transport.requests")
+        # google-auth would otherwise wait up to 120s for the token endpoint
+        request = partial(transport.Request(), timeout=settings.GOOGLE_TIMEOUT)
+        resilience.call("google", credentials.refresh, request)
+    return credentials
+
+def build_service(credentials):
+    """Build the My Business v4 client from the bundled discovery document.
+
+    Requests time out after GOOGLE_TIMEOUT; run them through execute().
+    """
+    global _discovery_doc
+    if _discovery_doc is None:
+        with open(DISCOVERY_DOC_PATH, "r") as f:
+            _discovery_doc = f.read()
+    discovery = lazy_import("googleapiclient.discovery")
+    httplib2 = lazy_import("httplib2")
+    http = lazy_import("google_auth_httplib2").AuthorizedHttp(
+        credentials, http=httplib2.Http(timeout=settings.GOOGLE_TIMEOUT)
+    )
+    client_options = {"api_endpoint": settings.GOOGLE_API_ENDPOINT} if settings.GOOGLE_API_ENDPOINT else None
+    return discovery.build_from_document(_discovery_doc, http=http, client_options=client_options)
+
+def execute(api_request):
+    """Execute a Google API request behind the Google circuit breaker and bulkhead."""
+    return resilience.call("google", api_request.execute)
@@ -0,0 +1,116 @@
+# app/utils/http_cache.py
+import gzip
+import hashlib
+import zlib
+from flask import current_app, request
+from app.config import settings
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+
+def make_etag(*parts):
+    """Build an ETag value from version strings (e.g. a stored reviews version)."""
+    return hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def is_not_modified(etag):
+    """True when the request's If-None-Match already names `etag`.
+
+    Checked by hand so POST routes can skip their work too; Werkzeug's
+    make_conditional only applies to GET and HEAD.
+    """
+    return request.if_none_match.contains_weak(etag)
+
+
+def cacheable(response, etag, max_age=0):
+    """Attach a weak ETag and private Cache-Control to a response.
+
+    The ETag is weak because compress_response may re-encode the body, and the
+    same version then covers the gzip, brotli and identity representations.
+    """
+    response.set_etag(etag, weak=True)
+    response.cache_control.private = True
+    if max_age:
+        response.cache_control.max_age = max_age
+    else:
+        response.cache_control.no_cache = True
+    response.vary.add("Cookie")
+    return response
+
+
+def not_modified_response(etag, max_age=0):
+    """Empty 304 carrying the same validators as the full response."""
+    return cacheable(current_app.response_class(status=304), etag, max_age)
+
+
+def _encoding():
+    """The best compression the client accepts: "br", "gzip" or None."""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def _compress_chunks(chunks, encoding):
+    """Compress a streamed body chunk by chunk, so it is still sent as it is produced."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=5)
+        for chunk in chunks:
+            compressed = compressor.process(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.finish()
+    else:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+        for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
+
+
+def compress_response(response):
+    """Compress large JSON bodies with brotli or gzip, per Accept-Encoding.
+
+    Streamed bodies (see json_response.array_response) are compressed as
+    they stream; they are only streamed when large, so no size check applies.
+    """
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.mimetype != "application/json"
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    if response.is_streamed:
+        encoding = _encoding()
+        if encoding:
+            response.response = _compress_chunks(response.iter_encoded(), encoding)
+            response.headers.pop("Content-Length", None)
+            response.headers["Content-Encoding"] = encoding
+        return response
+
+    data = response.get_data()
+    if len(data) < settings.COMPRESS_MIN_SIZE:
+        return response
+
+    encoding = _encoding()
+    if encoding == "br":
+        response.set_data(brotli.compress(data, quality=5))
+        response.headers["Content-Encoding"] = "br"
+    elif encoding == "gzip":
+        response.set_data(gzip.compress(data, compresslevel=6))
+        response.headers["Content-Encoding"] = "gzip"
+    return response
+
+
+def init_app(app):
+    """Register response compression on the Flask app."""
+    app.after_request(compress_response)
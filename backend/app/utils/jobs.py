@@ -0,0 +1,84 @@
+# app/utils/jobs.py
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app.config import settings
+from app.utils.redis_operations import get_redis
+
+logger = logging.getLogger(__name__)
+
+JOB_TTL = 24 * 3600  # Seconds a finished job's status stays readable
+
+# Background threads of this process, created on the first submit
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """The process-wide job pool, once per (forked) process."""
+    global _executor, _executor_pid
+    if _executor_pid != os.getpid():
+        with _executor_lock:
+            if _executor_pid != os.getpid():
+                _executor = ThreadPoolExecutor(max_workers=settings.JOB_WORKERS, thread_name_prefix="job")
+                _executor_pid = os.getpid()
+    return _executor
+
+
+def _save(job_id, **fields):
+    pipe = get_redis().pipeline()
+    pipe.hset(f"job:{job_id}", mapping=fields)
+    pipe.expire(f"job:{job_id}", JOB_TTL)
+    pipe.execute()
+
+
+def _run(job_id, fn, args, kwargs, lock_key):
+    _save(job_id, status="running", started_at=time.time())
+    try:
+        result = fn(*args, **kwargs)
+        _save(job_id, status="done", result=json.dumps(result), finished_at=time.time())
+    except Exception as e:
+        logger.exception(f"Job {job_id} failed")
+        _save(job_id, status="failed", error=str(e), finished_at=time.time())
+    finally:
+        if lock_key:
+            get_redis().delete(lock_key)
+
+
+def submit(kind, fn, *args, dedupe_key=None, **kwargs):
+    """Run fn(*args, **kwargs) on this process's job threads; returns the job id.
+
+    Long work (full review backfills, reply batches) runs here rather than in
+    the request, so it is not bound by the worker timeout. With `dedupe_key`
+    a job already queued or running under that key is reused instead; the
+    key is released after JOB_LOCK_TTL even if the process dies mid-job.
+    """
+    job_id = secrets.token_hex(8)
+    lock_key = f"job_lock:{dedupe_key}" if dedupe_key else None
+    redis_client = get_redis()
+    if lock_key and not redis_client.set(lock_key, job_id, nx=True, ex=settings.JOB_LOCK_TTL):
+        running = redis_client.get(lock_key)
+        if running is not None:
+            return running.decode()
+    _save(job_id, kind=kind, status="queued", created_at=time.time())
+    _get_executor().submit(_run, job_id, fn, args, kwargs, lock_key)
+    return job_id
+
+
+def load(job_id):
+    """A job's status dict ("status", "result", "error", timestamps), or None."""
+    job = get_redis().hgetall(f"job:{job_id}")
+    if not job:
+        return None
+    job = {key.decode(): value.decode() for key, value in job.items()}
+    if "result" in job:
+        job["result"] = json.loads(job["result"])
+    for key in ("created_at", "started_at", "finished_at"):
+        if key in job:
+            job[key] = float(job[key])
+    return {"id": job_id, **job}
@@ -0,0 +1,89 @@
+# app/utils/json_response.py
+import base64
+import orjson
+from flask import current_app
+from app.config import settings
+
+STREAM_CHUNK_SIZE = 64 * 1024  # Bytes buffered before each chunk is sent
+
+
+def dumps(obj):
+    """Encode to JSON bytes once; the same bytes go to Redis and the HTTP body."""
+    return orjson.dumps(obj)
+
+
+def loads(data):
+    return orjson.loads(data)
+
+
+def project(item, fields):
+    """Copy of `item` with only `fields`; dotted names pick nested keys (reviewer.displayName)."""
+    projected = {}
+    for field in fields:
+        source, target = item, projected
+        *parents, leaf = field.split(".")
+        for parent in parents:
+            source = source.get(parent)
+            if not isinstance(source, dict):
+                break
+            target = target.setdefault(parent, {})
+        else:
+            if leaf in source:
+                target[leaf] = source[leaf]
+    return projected
+
+
+def encode_cursor(item_id):
+    return base64.urlsafe_b64encode(dumps({"after": item_id})).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """The item id a cursor points after; ValueError if it is malformed."""
+    try:
+        return loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))["after"]
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def paginate(items, cursor=None, limit=None, key="reviewId"):
+    """Page of `items` after `cursor`, plus the cursor for the next page (or None).
+
+    Cursors name the last item seen rather than an offset, so a page boundary
+    stays put when new reviews arrive at the top between requests. ValueError
+    if the cursor is invalid or `limit` is given but below 1.
+    """
+    if limit is not None and limit < 1:
+        raise ValueError("limit must be a positive integer")
+    start = 0
+    if cursor:
+        after = decode_cursor(cursor)
+        positions = (i for i, item in enumerate(items) if item.get(key) == after)
+        start = next(positions, None)
+        if start is None:
+            raise ValueError("Cursor no longer matches any item; start again without it")
+        start += 1
+    end = len(items) if limit is None else min(start + limit, len(items))
+    page = items[start:end]
+    next_cursor = encode_cursor(page[-1][key]) if page and end < len(items) else None
+    return page, next_cursor
+
+
+def _stream_array(items):
+    """Yield a JSON array in chunks, encoding one item at a time."""
+    buffer = bytearray(b"[")
+    for i, item in enumerate(items):
+        if i:
+            buffer += b","
+        buffer += dumps(item)
+        if len(buffer) >= STREAM_CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    buffer += b"]"
+    yield bytes(buffer)
+
+
+def array_response(items):
+    """JSON array response; lists over STREAM_MIN_ITEMS are sent with chunked transfer."""
+    if len(items) >= settings.STREAM_MIN_ITEMS:
+        return current_app.response_class(_stream_array(items), mimetype="application/json")
+    return current_app.response_class(dumps(items), mimetype="application/json")
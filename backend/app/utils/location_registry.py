@@ -0,0 +1,149 @@
+# app/utils/location_registry.py
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from app.config import settings
+from app.models.location import guess_brand, normalize_name
+from app.utils import db_operations
+from app.utils.redis_operations import get_redis, init_redis
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "locations:invalidate"
+
+# Current Registry; replaced wholesale on reload so readers never need a lock
+_registry = None
+_load_lock = threading.Lock()
+_listener = None
+
+
+class Registry:
+    """Immutable snapshot of the active locations, indexed for O(1) lookups."""
+
+    def __init__(self, locations):
+        self.locations = [location for location in locations if location.get("active", True)]
+        self.loaded_at = time.monotonic()
+        self.version = hashlib.sha1(
+            json.dumps(self.locations, sort_keys=True).encode()
+        ).hexdigest()[:16]
+        self.by_name = {}
+        self.by_location_id = {}
+        self.by_account_id = defaultdict(list)
+        self.by_brand = defaultdict(list)
+        self.by_group = defaultdict(list)
+        for location in self.locations:
+            self.by_name[normalize_name(location["name"])] = location
+            self.by_location_id[location["location_id"]] = location
+            self.by_account_id[location["account_id"]].append(location)
+            if location.get("brand"):
+                self.by_brand[location["brand"].lower()].append(location)
+            if location.get("group_name"):
+                self.by_group[location["group_name"].lower()].append(location)
+
+    def find(self, name=None, location_id=None):
+        """Location by display name (case and punctuation insensitive) or by id."""
+        if location_id:
+            return self.by_location_id.get(location_id)
+        if name:
+            return self.by_name.get(normalize_name(name))
+        return None
+
+    def filter(self, account_id=None, brand=None, group=None):
+        """Locations matching every given filter, in name order."""
+        candidates = self.locations
+        if account_id:
+            candidates = self.by_account_id.get(account_id, [])
+        if brand:
+            brand_ids = {id(location) for location in self.by_brand.get(brand.lower(), [])}
+            candidates = [location for location in candidates if id(location) in brand_ids]
+        if group:
+            group_ids = {id(location) for location in self.by_group.get(group.lower(), [])}
+            candidates = [location for location in candidates if id(location) in group_ids]
+        return candidates
+
+
+def seed_locations():
+    """Rows for the locations table built from settings.LOCATIONS."""
+    return [
+        {
+            "location_id": location_id,
+            "account_id": account_id,
+            "name": name,
+            "brand": guess_brand(name),
+            "group_name": account_id,
+        }
+        for name, (account_id, location_id) in settings.LOCATIONS.items()
+    ]
+
+
+def load():
+    """Build a Registry from the database, seeding it from settings on first run.
+
+    If the database is unreachable the settings dict is served instead, so the
+    app keeps working with the built-in rooftops.
+    """
+    try:
+        locations = db_operations.fetch_locations()
+        if not locations:
+            db_operations.upsert_locations(seed_locations())
+            locations = db_operations.fetch_locations()
+    except Exception as e:
+        logger.error(f"Could not load locations from the database, using settings: {e}")
+        locations = seed_locations()
+    return Registry(locations)
+
+
+def reload():
+    global _registry
+    with _load_lock:
+        _registry = load()
+    logger.info(f"Loaded {len(_registry.locations)} locations (version {_registry.version})")
+    return _registry
+
+
+def _listen():
+    """Reload whenever another process publishes an invalidation."""
+    while True:
+        try:
+            # Own client without a read timeout: listen() blocks between messages
+            pubsub = init_redis(socket_timeout=None).pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(INVALIDATION_CHANNEL)
+            for _ in pubsub.listen():
+                reload()
+        except Exception as e:
+            logger.error(f"Location invalidation listener failed, retrying: {e}")
+            time.sleep(5)
+
+
+def _start_listener():
+    # Started lazily so each forked worker gets its own thread and connection
+    global _listener
+    if _listener is None or not _listener.is_alive():
+        _listener = threading.Thread(target=_listen, name="location-registry", daemon=True)
+        _listener.start()
+
+
+def _is_stale(registry):
+    return registry is None or time.monotonic() - registry.loaded_at > settings.LOCATIONS_RELOAD_INTERVAL
+
+
+def get_registry():
+    """The current Registry, loading it on first use and refreshing stale copies."""
+    global _registry
+    if _is_stale(_registry):
+        with _load_lock:
+            # Another thread may have reloaded while this one waited
+            if _is_stale(_registry):
+                _registry = load()
+            _start_listener()
+    return _registry
+
+
+def save_locations(locations):
+    """Upsert locations and tell every process to reload."""
+    db_operations.upsert_locations(locations)
+    reload()
+    get_redis().publish(INVALIDATION_CHANNEL, "reload")
@@ -0,0 +1,86 @@
+# app/utils/model_routing.py
+from app.config import settings
+from app.utils.redis_operations import get_redis
+
+# Summary modes trade quality for latency and cost. batch_size is reviews per
+# LLM call, max_tokens the completion budget per review in a call, words the
+# target summary length and concurrency the LLM calls in flight per request.
+MODES = {
+    "fast": {"model": "gpt-3.5-turbo", "batch_size": 25, "max_tokens": 30, "words": 12, "concurrency": 4},
+    "balanced": {"model": "gpt-3.5-turbo", "batch_size": 10, "max_tokens": 50, "words": 20, "concurrency": 4},
+    "thorough": {"model": "gpt-4", "batch_size": 1, "max_tokens": 80, "words": 30, "concurrency": 2},
+}
+CHEAP_MODE = "fast"
+
+# USD per 1K (prompt, completion) tokens; update when OpenAI pricing changes
+PRICES = {
+    "gpt-3.5-turbo": (0.0015, 0.002),
+    "gpt-4": (0.03, 0.06),
+}
+
+METRIC_FIELDS = ("runs", "reviews", "llm_calls", "prompt_tokens", "completion_tokens", "seconds", "cost")
+
+
+def concurrency(mode):
+    """LLM calls in flight for one run of `mode`.
+
+    Capped at half the OpenAI bulkhead so two runs in one process (gthread
+    workers) can share it instead of one starving the other.
+    """
+    return max(1, min(MODES[mode]["concurrency"], settings.UPSTREAM_CONCURRENCY["openai"] // 2))
+
+
+def resolve_mode(mode=None, location=None):
+    """The explicit mode, else the location's default, else SUMMARY_MODE."""
+    mode = mode or (location or {}).get("summary_mode") or settings.SUMMARY_MODE
+    if mode not in MODES:
+        raise ValueError(f"Unknown summary mode: {mode}")
+    return mode
+
+
+def route(comment, mode):
+    """Path for one review comment under `mode`.
+
+    None for empty comments, "verbatim" for comments short enough to be their
+    own summary, CHEAP_MODE for short ones, otherwise `mode` itself.
+    """
+    words = len(comment.split())
+    if not words:
+        return None
+    if words < settings.SUMMARY_VERBATIM_WORDS:
+        return "verbatim"
+    if words < settings.SUMMARY_SHORT_REVIEW_WORDS:
+        return CHEAP_MODE
+    return mode
+
+
+def cost(model, prompt_tokens, completion_tokens):
+    prompt_price, completion_price = PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+
+
+def record_run(mode, stats):
+    """Add one summary run's stats to the running totals for `mode`."""
+    key = f"summary_metrics:{mode}"
+    pipe = get_redis().pipeline()
+    pipe.hincrby(key, "runs", 1)
+    for field in METRIC_FIELDS[1:]:
+        pipe.hincrbyfloat(key, field, stats.get(field, 0))
+    pipe.execute()
+
+
+def mode_metrics():
+    """Totals and per-run averages of latency and cost for every mode."""
+    pipe = get_redis().pipeline()
+    for mode in MODES:
+        pipe.hgetall(f"summary_metrics:{mode}")
+    metrics = {}
+    for mode, totals in zip(MODES, pipe.execute()):
+        totals = {field.decode(): float(value) for field, value in totals.items()}
+        runs = totals.get("runs", 0)
+        metrics[mode] = {
+            **{field: totals.get(field, 0) for field in METRIC_FIELDS},
+            "avg_seconds": totals.get("seconds", 0) / runs if runs else None,
+            "avg_cost": totals.get("cost", 0) / runs if runs else None,
+        }
+    return metrics
@@ -1,54 +1,50 @@
 # app/utils/openai_operations.py
-import json
-import openai
-import flask
+from app.config import settings
+from app.utils import resilience
+from app.utils.startup import lazy_import
+
+# OpenAI module, imported and configured on first completion
+_openai = None
 
 # Initialize OpenAI by setting the API key
-def initialize_openai(api_key):
-    openai.api_key = api_key
+def initialize_openai(api_key=None):
+    global _openai
+    openai = lazy_import("openai")
+    openai.api_key = api_key or settings.OPENAI_API_KEY
+    if settings.OPENAI_API_BASE:
+        openai.api_base = settings.OPENAI_API_BASE
+    _openai = openai
+    return openai
 
 # Function to get completion from OpenAI's GPT model
-def get_completion(prompt, model="gpt-3.5-turbo"):
+def get_completion(prompt, model="gpt-3.5-turbo", temperature=0.7, max_tokens=None, bulkhead_wait=None):
+    return get_chat_completion(prompt, model, temperature, max_tokens, bulkhead_wait)[0]
+
+# Completion text plus the token usage reported by OpenAI
+def get_chat_completion(prompt, model="gpt-3.5-turbo", temperature=0.7, max_tokens=None, bulkhead_wait=None):
+    openai = _openai or initialize_openai()
     messages = [{"role": "user", "content": prompt}]
-    response = openai.ChatCompletion.create(
+    options = {"max_tokens": max_tokens} if max_tokens else {}
+    response = resilience.call(
+        "openai",
+        openai.ChatCompletion.create,
         model=model,
         messages=messages,
-        temperature=0.7  # Degree of randomness in output
+        temperature=temperature,  # Degree of randomness in output
+        request_timeout=settings.OPENAI_TIMEOUT,
+        bulkhead_wait=bulkhead_wait,
+        **options,
     )
-    return response.choices[0].message["content"]
-
-# Function to add the summarize_reviews route to the Flask app
-def add_summarize_reviews_route(app, redis_client, logger):
-    
-    @app.route("/summarize_reviews", methods=["POST"])
-    def summarize_reviews():
-        try:
-            location_name = flask.request.json.get("location_name", None)
-            if not location_name:
-                return flask.jsonify({"error": "No location_name provided"}), 400
-
-            # Fetch reviews from Redis based on location_name
-            redis_key = f"reviews_{location_name}"
-            reviews_json = redis_client.get(redis_key)
-
-            if reviews_json is None:
-                return flask.jsonify({"error": "No reviews found for the given location, please fetch them first"}), 400
-
-            reviews = json.loads(reviews_json)
-
-            summaries = []
-            for review in reviews:
-                comment = review.get("comment", "")
-                prompt = f"""
-    ...  # (your existing prompt here)
-    """
-                summary = get_completion(prompt)
-                logger.debug(f"Generated Summary: {summary}")  # Debugging line
-                summaries.append(summary)
-
-            return flask.jsonify({"summary": " ".join(summaries)})
-
-        except Exception as e:
-            logger.error(f"Exception occurred: {e}")
-            logger.exception("Exception details:")
-            return flask.jsonify({"error": str(e)}), 500
+    usage = response.get("usage", {})
+    return response.choices[0].message["content"], {
+        "prompt_tokens": usage.get("prompt_tokens", 0),
+        "completion_tokens": usage.get("completion_tokens", 0),
+    }
+
+# Function to get embeddings for a batch of texts from OpenAI
+def get_embeddings(texts, model="text-embedding-ada-002"):
+    openai = _openai or initialize_openai()
+    response = resilience.call(
+        "openai", openai.Embedding.create, model=model, input=texts, request_timeout=settings.OPENAI_TIMEOUT
+    )
+    return [item["embedding"] for item in sorted(response["data"], key=lambda item: item["index"])]
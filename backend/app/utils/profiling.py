@@ -0,0 +1,270 @@
+# app/utils/profiling.py
+import cProfile
+import io
+import json
+import marshal
+import os
+import pstats
+import secrets
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from flask import g, request
+from app.config import settings
+from app.utils.admin import is_admin
+from app.utils.redis_operations import get_redis
+from app.utils.startup import lazy_import
+
+PROFILE_TTL = 3600  # Seconds a captured profile stays downloadable
+PROFILE_MODES = ("sample", "cprofile", "pyinstrument")  # The first is the default
+REQUEST_SAMPLE_INTERVAL = 0.001  # Seconds between samples of a single profiled request
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse(frame):
+    """Stack as root-first 'a;b;c', the collapsed-stack (flame graph) format."""
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def to_collapsed(stacks):
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def to_speedscope(stacks, name):
+    """speedscope 'sampled' profile JSON for a Counter of collapsed stacks."""
+    frames, index, samples, weights = [], {}, [], []
+    for stack, count in stacks.items():
+        sample = []
+        for frame_name in stack.split(";"):
+            if frame_name not in index:
+                index[frame_name] = len(frames)
+                frames.append({"name": frame_name})
+            sample.append(index[frame_name])
+        samples.append(sample)
+        weights.append(count)
+    return json.dumps({
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "globalLocalDev",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "none",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": samples,
+            "weights": weights,
+        }],
+    })
+
+
+class StackSampler:
+    """Samples thread stacks every `interval` seconds from a background thread.
+
+    Only Python frames are walked (sys._current_frames), so the cost per
+    sample is small and independent of how busy the sampled threads are.
+    With `thread_ids` (a set that may change while sampling) only those
+    threads are sampled.
+    """
+
+    def __init__(self, interval, thread_ids=None):
+        self.interval = interval
+        self.thread_ids = thread_ids
+        self.stacks = Counter()
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample(self):
+        own = threading.get_ident()
+        wanted = set(self.thread_ids) if self.thread_ids is not None else None
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own or (wanted is not None and thread_id not in wanted):
+                continue
+            stack = collapse(frame)
+            with self.lock:
+                self.stacks[stack] += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def snapshot(self, reset=False):
+        with self.lock:
+            stacks = Counter(self.stacks)
+            if reset:
+                self.stacks.clear()
+        return stacks
+
+
+# Always-on sampler for this process, started on its first request. It only
+# samples threads serving a request, so idle waits (the accept loop, the
+# location listener, pool threads) stay out of the flame graph.
+_request_threads = set()
+_sampler = None
+_sampler_pid = None
+_sampler_lock = threading.Lock()
+
+
+def ensure_sampler():
+    """Start the process-wide sampler, once per (forked) process."""
+    global _sampler, _sampler_pid
+    if _sampler_pid != os.getpid():
+        with _sampler_lock:
+            if _sampler_pid != os.getpid():
+                _request_threads.clear()
+                _sampler = StackSampler(settings.PROFILER_INTERVAL, thread_ids=_request_threads).start()
+                _sampler_pid = os.getpid()
+    return _sampler
+
+
+def _save(profile_id, formats):
+    """Store rendered formats in Redis so any worker can serve the download."""
+    pipe = get_redis().pipeline()
+    pipe.setex(f"profile:{profile_id}:formats", PROFILE_TTL, ",".join(formats))
+    for fmt, data in formats.items():
+        pipe.setex(f"profile:{profile_id}:{fmt}", PROFILE_TTL, data)
+    pipe.execute()
+
+
+def load(profile_id, fmt=None):
+    """(format, data) of a stored profile; `fmt` defaults to the capture's first format.
+
+    data is None when the profile expired or was not captured in `fmt`.
+    """
+    redis_client = get_redis()
+    if fmt is None:
+        formats = redis_client.get(f"profile:{profile_id}:formats")
+        if formats is None:
+            return None, None
+        fmt = formats.decode().split(",")[0]
+    return fmt, redis_client.get(f"profile:{profile_id}:{fmt}")
+
+
+def before_request():
+    if settings.PROFILER_SAMPLING:
+        ensure_sampler()
+        _request_threads.add(threading.get_ident())
+
+    mode = request.headers.get("X-Profile")
+    if not mode or not is_admin():
+        return
+    # Any other value (e.g. "1") gets the default, which yields flame graph formats
+    mode = mode.lower() if mode.lower() in PROFILE_MODES else PROFILE_MODES[0]
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+    elif mode == "sample":
+        profiler = StackSampler(REQUEST_SAMPLE_INTERVAL, thread_ids={threading.get_ident()}).start()
+    else:
+        profiler = lazy_import("pyinstrument").Profiler()
+        profiler.start()
+    g.profile = (mode, profiler)
+
+
+def after_request(response):
+    profile = g.pop("profile", None)
+    if profile is None:
+        return response
+    mode, profiler = profile
+    name = f"{request.method} {request.path}"
+
+    if mode == "cprofile":
+        profiler.disable()
+        text = io.StringIO()
+        stats = pstats.Stats(profiler, stream=text)
+        stats.sort_stats("cumulative").print_stats(50)
+        formats = {"text": text.getvalue(), "pstats": marshal.dumps(stats.stats)}
+    elif mode == "sample":
+        profiler.stop()
+        stacks = profiler.snapshot()
+        formats = {"collapsed": to_collapsed(stacks), "speedscope": to_speedscope(stacks, name)}
+    else:
+        profiler.stop()
+        renderers = lazy_import("pyinstrument.renderers")
+        formats = {
+            "speedscope": profiler.output(renderers.SpeedscopeRenderer()),
+            "html": profiler.output_html(),
+        }
+
+    profile_id = secrets.token_hex(8)
+    _save(profile_id, formats)
+    response.headers["X-Profile-Id"] = profile_id
+    response.headers["X-Profile-Formats"] = ",".join(formats)
+    return response
+
+
+# Previous snapshot, so each call reports growth since the last one
+_last_snapshot = None
+
+
+def tracemalloc_report(limit=25, group_by="lineno"):
+    """Top allocation sites, and their growth since the previous call.
+
+    The first call starts tracemalloc (it costs memory and CPU while on), so
+    it only starts collecting from that point.
+    """
+    global _last_snapshot
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(settings.TRACEMALLOC_FRAMES)
+        _last_snapshot = None
+        return {"tracing": True, "started": True, "stats": []}
+
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    if _last_snapshot is not None:
+        stats = snapshot.compare_to(_last_snapshot, group_by)[:limit]
+        rows = [
+            {"site": str(stat.traceback), "size": stat.size, "size_diff": stat.size_diff,
+             "count": stat.count, "count_diff": stat.count_diff}
+            for stat in stats
+        ]
+    else:
+        rows = [
+            {"site": str(stat.traceback), "size": stat.size, "count": stat.count}
+            for stat in snapshot.statistics(group_by)[:limit]
+        ]
+    _last_snapshot = snapshot
+    current, peak = tracemalloc.get_traced_memory()
+    return {"tracing": True, "started": False, "pid": os.getpid(),
+            "current": current, "peak": peak, "stats": rows}
+
+
+def stop_tracemalloc():
+    global _last_snapshot
+    tracemalloc.stop()
+    _last_snapshot = None
+
+
+def teardown_request(exc):
+    # Runs even when the view raised, unlike after_request
+    _request_threads.discard(threading.get_ident())
+
+
+def init_app(app):
+    """Register the per-request profiling hooks (only when PROFILING_ENABLED)."""
+    app.before_request(before_request)
+    app.after_request(after_request)
+    app.teardown_request(teardown_request)
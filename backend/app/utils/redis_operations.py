@@ -1,17 +1,93 @@
 # app/utils/redis_operations.py
+import hashlib
+import json
 import os
+import time
 from flask import Blueprint
-import redis
 from app.config import settings
+from app.utils.startup import lazy_import
 
 redis_operations = Blueprint('redis_operations', __name__)
 
-def init_redis():
-    """Initialize Redis client."""
-    return redis.StrictRedis(
+# Shared client, created on first use by get_redis()
+_redis_client = None
+
+def init_redis(socket_timeout=settings.REDIS_TIMEOUT):
+    """Initialize Redis client.
+
+    The blocking pool is the Redis bulkhead: at most REDIS_MAX_CONNECTIONS
+    commands run at once, and callers wait at most REDIS_TIMEOUT for one.
+    Pass socket_timeout=None for long-lived blocking reads such as pub/sub.
+    """
+    redis = lazy_import("redis")
+    pool = redis.BlockingConnectionPool(
         host=settings.REDIS_HOST,
         port=settings.REDIS_PORT,
         db=settings.REDIS_DB,
         password=settings.REDIS_PASSWORD,
-        ssl=False,  # Disable SSL
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=settings.REDIS_TIMEOUT,
+        socket_timeout=socket_timeout,
+        socket_connect_timeout=settings.REDIS_TIMEOUT,
+    )  # SSL stays disabled
+    return redis.StrictRedis(connection_pool=pool)
+
+def get_redis():
+    """Return the shared Redis client, creating it on first use.
+
+    The client only opens connections when a command runs, and its pool
+    reconnects after a fork, so a preloading gunicorn master can create it.
+    """
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = init_redis()
+    return _redis_client
+
+def store_reviews(location_name, reviews_json, ttl=7200):
+    """Store a location's reviews (JSON bytes) with a content version; returns the version."""
+    version = hashlib.sha1(reviews_json).hexdigest()
+    pipe = get_redis().pipeline()
+    pipe.setex(f"reviews_{location_name}", ttl, reviews_json)
+    pipe.setex(f"reviews_version_{location_name}", ttl, version)
+    pipe.setex(f"reviews_synced_{location_name}", ttl, time.time())
+    pipe.execute()
+    return version
+
+def load_reviews_version(location_name):
+    """Return (version, seconds since the last sync) for a location, or (None, None)."""
+    version, synced_at = get_redis().mget(
+        f"reviews_version_{location_name}", f"reviews_synced_{location_name}"
+    )
+    if version is None or synced_at is None:
+        return None, None
+    return version.decode(), time.time() - float(synced_at)
+
+def load_reviews(location_name):
+    """Return (reviews_json, version) for a location, or (None, None)."""
+    reviews_json, version = get_redis().mget(
+        f"reviews_{location_name}", f"reviews_version_{location_name}"
     )
+    if reviews_json is None:
+        return None, None
+    if version is None:
+        # Stored before versions were tracked
+        return reviews_json, hashlib.sha1(reviews_json).hexdigest()
+    return reviews_json, version.decode()
+
+def store_summary(location_name, artifact, ttl):
+    """Store a summary artifact under its version and mark it as the latest."""
+    pipe = get_redis().pipeline()
+    pipe.setex(f"summary_{location_name}_{artifact['version']}", ttl, json.dumps(artifact))
+    pipe.setex(f"summary_latest_{location_name}", ttl, artifact["version"])
+    pipe.execute()
+
+def load_summary(location_name, version=None):
+    """Return a stored summary artifact (the latest one if no version), or None."""
+    redis_client = get_redis()
+    if version is None:
+        version = redis_client.get(f"summary_latest_{location_name}")
+        if version is None:
+            return None
+        version = version.decode()
+    artifact_json = redis_client.get(f"summary_{location_name}_{version}")
+    return json.loads(artifact_json) if artifact_json is not None else None
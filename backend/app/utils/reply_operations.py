@@ -0,0 +1,175 @@
+# app/utils/reply_operations.py
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app.config import settings
+from app.utils import db_operations, google_api
+from app.utils.openai_operations import get_completion
+from app.utils.redis_operations import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Bump when the prompt changes so cached drafts are not reused
+PROMPT_VERSION = "1"
+DRAFT_TTL = 7 * 24 * 3600  # Seconds a drafted reply stays cached
+BATCH_PROMPT = (
+    "You reply to Google reviews on behalf of a car dealership. Write a short, "
+    "friendly, professional reply to each numbered review below. Thank positive "
+    "reviewers; apologise to unhappy ones and invite them to contact the store. "
+    "Return only a JSON array of strings, one reply per review, in order.\n\n{reviews}"
+)
+
+
+class RateLimiter:
+    """Spaces out calls across threads to at most `rate` per second."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self.lock = threading.Lock()
+        self.next_slot = time.monotonic()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def _draft_key(review):
+    content = f"{PROMPT_VERSION}|{review['star_rating']}|{review['reviewer_name']}|{review['comment']}"
+    return f"reply_draft:{hashlib.sha1(content.encode()).hexdigest()}"
+
+
+def _describe(number, review):
+    comment = review["comment"] or "(no comment, rating only)"
+    return f"{number}. {review['reviewer_name']} ({review['star_rating']} stars): {comment}"
+
+
+def _parse_replies(text, expected):
+    """The JSON array of replies in an LLM answer, or None if it is malformed."""
+    try:
+        replies = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(replies, list) or len(replies) != expected:
+        return None
+    return [str(reply).strip() for reply in replies]
+
+
+def _draft_batch(reviews):
+    """Draft replies for a batch in one LLM call, falling back to one call per review."""
+    listing = "\n".join(_describe(i + 1, review) for i, review in enumerate(reviews))
+    replies = _parse_replies(
+        get_completion(BATCH_PROMPT.format(reviews=listing), bulkhead_wait=settings.BATCH_BULKHEAD_WAIT),
+        len(reviews),
+    )
+    if replies is not None:
+        return replies
+
+    logger.warning(f"Batch draft for {len(reviews)} reviews was malformed; drafting one by one")
+    replies = []
+    for review in reviews:
+        answer = get_completion(
+            BATCH_PROMPT.format(reviews=_describe(1, review)), bulkhead_wait=settings.BATCH_BULKHEAD_WAIT
+        )
+        parsed = _parse_replies(answer, 1)
+        replies.append(parsed[0] if parsed else answer.strip())
+    return replies
+
+
+def draft_replies(location_names=None, limit=500):
+    """Draft replies for unreplied reviews and queue them for approval.
+
+    Drafts are cached by review content, so only reviews never drafted before
+    reach the LLM; those are sent REPLY_DRAFT_BATCH_SIZE per call, with up to
+    REPLY_DRAFT_WORKERS calls in flight. Returns the number of drafts queued.
+    """
+    reviews = db_operations.fetch_unreplied_reviews(location_names, limit)
+    if not reviews:
+        return 0
+
+    redis_client = get_redis()
+    keys = [_draft_key(review) for review in reviews]
+    drafts = [value.decode() if value is not None else None for value in redis_client.mget(keys)]
+
+    missing = [i for i, draft in enumerate(drafts) if draft is None]
+    size = settings.REPLY_DRAFT_BATCH_SIZE
+    batches = [missing[start:start + size] for start in range(0, len(missing), size)]
+    with ThreadPoolExecutor(max_workers=settings.REPLY_DRAFT_WORKERS) as executor:
+        results = executor.map(lambda batch: _draft_batch([reviews[i] for i in batch]), batches)
+        for batch, replies in zip(batches, results):
+            pipe = redis_client.pipeline()
+            for i, reply in zip(batch, replies):
+                drafts[i] = reply
+                pipe.setex(keys[i], DRAFT_TTL, reply)
+            pipe.execute()
+
+    db_operations.queue_reply_drafts([
+        (review["review_id"], review["location_name"], draft)
+        for review, draft in zip(reviews, drafts)
+    ])
+    return len(reviews)
+
+
+def post_approved_replies(credentials_dict, limit=500):
+    """Post approved replies through reviews().updateReply concurrently.
+
+    Each reply's key is recorded before it is sent, so a reply reclaimed
+    after a crash is only re-sent if Google does not already show it.
+    Returns {"posted": n, "skipped": n, "failed": [{"review_id", "error"}]}.
+    """
+    # Refreshed before claiming, so a failed refresh leaves nothing stuck in posting
+    credentials = google_api.credentials_from_dict(credentials_dict)
+    replies = db_operations.claim_approved_replies(limit)
+    if not replies:
+        return {"posted": 0, "skipped": 0, "failed": []}
+
+    limiter = RateLimiter(settings.REPLY_POSTS_PER_SECOND)
+    # API clients share an httplib2 connection and are not thread safe
+    local = threading.local()
+
+    def service():
+        if not hasattr(local, "service"):
+            local.service = google_api.build_service(credentials)
+        return local.service
+
+    def already_posted(reply, name):
+        # A run that crashed after sending may have left this exact text on Google
+        review = google_api.execute(service().accounts().locations().reviews().get(name=name))
+        return review.get("reviewReply", {}).get("comment") == reply["draft"]
+
+    def post(reply):
+        name = f"accounts/{reply['account_id']}/locations/{reply['location_id']}/reviews/{reply['review_id']}"
+        try:
+            if reply["posted_key"] == reply["idempotency_key"] and already_posted(reply, name):
+                db_operations.finish_reply(reply["review_id"], reply["idempotency_key"])
+                return "skipped", None
+            db_operations.mark_reply_sending(reply["review_id"], reply["idempotency_key"])
+            limiter.wait()
+            google_api.execute(service().accounts().locations().reviews().updateReply(
+                name=name, body={"comment": reply["draft"]}
+            ))
+            db_operations.finish_reply(reply["review_id"], reply["idempotency_key"])
+            return "posted", None
+        except Exception as e:
+            logger.error(f"Failed to post reply for {reply['review_id']}: {e}")
+            try:
+                db_operations.finish_reply(reply["review_id"], reply["idempotency_key"], error=str(e))
+            except Exception as finish_error:
+                # Left in posting; a later run reclaims it once REPLY_POSTING_TIMEOUT passes
+                logger.error(f"Could not record failure for {reply['review_id']}: {finish_error}")
+            return "failed", str(e)
+
+    summary = {"posted": 0, "skipped": 0, "failed": []}
+    with ThreadPoolExecutor(max_workers=settings.REPLY_POST_WORKERS) as executor:
+        for reply, (outcome, error) in zip(replies, executor.map(post, replies)):
+            if outcome == "failed":
+                summary["failed"].append({"review_id": reply["review_id"], "error": error})
+            else:
+                summary[outcome] += 1
+    return summary
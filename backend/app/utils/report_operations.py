@@ -0,0 +1,262 @@
+# app/utils/report_operations.py
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, time as clock, timedelta, timezone
+from zoneinfo import ZoneInfo
+from app.config import settings
+from app.models.location import normalize_name
+from app.utils import db_operations, google_api, location_registry, model_routing, review_sync
+from app.utils.openai_operations import get_chat_completion
+from app.utils.redis_operations import get_redis
+from app.utils.startup import lazy_import
+from app.utils.summary_operations import summarize_comments
+
+logger = logging.getLogger(__name__)
+
+# Bump when the digest prompt or layout changes so existing digests are rebuilt
+REPORT_VERSION = "1"
+DIGEST_PROMPT = (
+    "Below are summaries of last week's customer reviews for {location_name}, a car "
+    "dealership location, with their star ratings. In about {words} words, tell the "
+    "manager what customers said: recurring praise, recurring complaints and anything "
+    "that needs action.\n\n{summaries}"
+)
+DIGEST_WORDS = 80
+LOCK_KEY = "reports:lock"
+LOCK_TTL = 3600  # Seconds before a crashed run's lock is released
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "..", "templates")
+
+# Google client for this worker process, built on its first sync
+_service = None
+
+
+def slugify(name):
+    return normalize_name(name).replace(" ", "-")
+
+
+def last_week():
+    """Monday of the last complete week in REPORT_TIMEZONE."""
+    today = datetime.now(ZoneInfo(settings.REPORT_TIMEZONE)).date()
+    return today - timedelta(days=today.weekday() + 7)
+
+
+def _write(path, data):
+    """Write atomically, so the endpoint never serves a half-written file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def next_run(now=None):
+    """Next REPORT_WEEKDAY at REPORT_HOUR in REPORT_TIMEZONE, strictly after `now`."""
+    tz = ZoneInfo(settings.REPORT_TIMEZONE)
+    now = (now or datetime.now(timezone.utc)).astimezone(tz)
+    day = now.date() + timedelta(days=(settings.REPORT_WEEKDAY - now.weekday()) % 7)
+    run = datetime.combine(day, clock(settings.REPORT_HOUR), tz)
+    return run if run > now else run + timedelta(weeks=1)
+
+
+def _sync(location):
+    """Index a location's latest reviews from Google before its digest is built.
+
+    A scheduled run has no user session, so this uses REPORT_REFRESH_TOKEN
+    and is skipped when it is unset. Failures are logged and the digest is
+    built from the stored reviews; it shows when those were last synced.
+    """
+    global _service
+    if not settings.REPORT_REFRESH_TOKEN:
+        return
+    try:
+        if _service is None:
+            credentials = google_api.credentials_from_dict(
+                {"token": None, "refresh_token": settings.REPORT_REFRESH_TOKEN}
+            )
+            _service = google_api.build_service(credentials)
+        review_sync.sync(_service, location)
+    except Exception as e:
+        logger.warning(f"Could not sync {location['name']} before its digest: {e}")
+
+
+def _render_html(report):
+    jinja2 = lazy_import("jinja2")
+    env = jinja2.Environment(loader=jinja2.FileSystemLoader(TEMPLATES_DIR), autoescape=True)
+    return env.get_template("digest.html").render(report=report)
+
+
+def build_report(location, week_start):
+    """Build, render and store one location's digest for the week starting `week_start`.
+
+    Runs in a worker process. The location is synced from Google first (see
+    _sync). The week's numbers come from the rollups kept by record_history;
+    review summaries come from the per-review cache, so only reviews never
+    summarized in this mode reach the LLM. The digest paragraph is only
+    regenerated when those inputs changed.
+    """
+    _sync(location)
+    synced_at = db_operations.last_synced(location["location_id"])
+    stale = synced_at is None or (
+        datetime.now(timezone.utc) - synced_at > timedelta(hours=settings.REPORT_STALE_HOURS)
+    )
+    tz = ZoneInfo(settings.REPORT_TIMEZONE)
+    week_end = week_start + timedelta(days=7)
+    mode = model_routing.resolve_mode(settings.REPORT_SUMMARY_MODE, location)
+    slug = slugify(location["name"])
+    week_dir = os.path.join(settings.REPORTS_DIR, week_start.isoformat())
+
+    rollups, _ = db_operations.fetch_trends(
+        location["location_id"],
+        period="week",
+        since=week_start - timedelta(weeks=settings.REPORT_WEEKS - 1),
+        until=week_end,
+    )
+    week_stats = next((row for row in rollups if row["period_start"] == week_start.isoformat()), None)
+    reviews, _ = db_operations.search_reviews(
+        location_name=location["name"],
+        since=datetime.combine(week_start, clock(), tz),
+        until=datetime.combine(week_end, clock(), tz),
+        page_size=settings.REPORT_MAX_REVIEWS,
+    )
+    summaries, stats = summarize_comments([review["comment"] or "" for review in reviews], mode)
+
+    highlights = [
+        {"star_rating": review["star_rating"], "reviewer_name": review["reviewer_name"], "summary": summary}
+        for review, summary in zip(reviews, summaries) if summary
+    ]
+    source_version = hashlib.sha1(
+        json.dumps([REPORT_VERSION, mode, week_stats, highlights], sort_keys=True).encode()
+    ).hexdigest()[:16]
+
+    previous = _read_json(os.path.join(week_dir, f"{slug}.json"))
+    if previous and previous.get("source_version") == source_version:
+        digest = previous["digest"]
+    elif highlights:
+        listing = "\n".join(f"- ({item['star_rating']} stars) {item['summary']}" for item in highlights)
+        params = model_routing.MODES[mode]
+        digest, usage = get_chat_completion(
+            DIGEST_PROMPT.format(location_name=location["name"], words=DIGEST_WORDS, summaries=listing),
+            model=params["model"],
+            temperature=0,
+            max_tokens=DIGEST_WORDS * 2,
+        )
+        stats["llm_calls"] += 1
+        stats["cost"] = round(stats["cost"] + model_routing.cost(
+            params["model"], usage["prompt_tokens"], usage["completion_tokens"]
+        ), 6)
+    elif stale:
+        digest = "No reviews found for this week, but this location's reviews may be out of date."
+    else:
+        digest = "No new reviews this week."
+    model_routing.record_run(mode, stats)
+
+    report = {
+        "location_name": location["name"],
+        "location_id": location["location_id"],
+        "slug": slug,
+        "week_start": week_start.isoformat(),
+        "week_end": week_end.isoformat(),
+        "mode": mode,
+        "digest": digest,
+        "stats": week_stats,
+        "trend": rollups,
+        "highlights": highlights,
+        "source_version": source_version,
+        "synced_at": synced_at.isoformat() if synced_at else None,
+        "stale": stale,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "generation": stats,
+    }
+    _write(os.path.join(week_dir, f"{slug}.json"), json.dumps(report, indent=2))
+    _write(os.path.join(week_dir, f"{slug}.html"), _render_html(report))
+    return {
+        "location_name": location["name"],
+        "slug": slug,
+        "review_count": week_stats["review_count"] if week_stats else 0,
+        "average_rating": week_stats["average_rating"] if week_stats else None,
+        "synced_at": report["synced_at"],
+        "stale": stale,
+    }
+
+
+def generate_reports(week_start=None, location_names=None, workers=None):
+    """Build every active location's digest across a process pool and write the index.
+
+    A Redis lock keeps overlapping scheduled runs from doing the work twice;
+    returns None if another run holds it. Workers are spawned rather than
+    forked so none inherits this process's database or Redis connections.
+    """
+    week_start = week_start or last_week()
+    redis_client = get_redis()
+    if not redis_client.set(LOCK_KEY, os.getpid(), nx=True, ex=LOCK_TTL):
+        logger.warning("Another report run is in progress; skipping")
+        return None
+
+    try:
+        start = time.perf_counter()
+        locations = location_registry.load().locations
+        if location_names:
+            wanted = {normalize_name(name) for name in location_names}
+            locations = [location for location in locations if normalize_name(location["name"]) in wanted]
+
+        entries, errors = [], []
+        with ProcessPoolExecutor(
+            max_workers=workers or settings.REPORT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            futures = {executor.submit(build_report, location, week_start): location for location in locations}
+            for future in as_completed(futures):
+                location = futures[future]
+                try:
+                    entries.append(future.result())
+                except Exception as e:
+                    logger.error(f"Digest for {location['name']} failed: {e}")
+                    errors.append({"location_name": location["name"], "error": str(e)})
+
+        index = {
+            "week_start": week_start.isoformat(),
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "seconds": round(time.perf_counter() - start, 3),
+            "reports": sorted(entries, key=lambda entry: entry["location_name"]),
+            "errors": errors,
+        }
+        index_json = json.dumps(index, indent=2)
+        _write(os.path.join(settings.REPORTS_DIR, week_start.isoformat(), "index.json"), index_json)
+        latest = _read_json(os.path.join(settings.REPORTS_DIR, "index.json"))
+        if latest is None or latest["week_start"] <= index["week_start"]:
+            _write(os.path.join(settings.REPORTS_DIR, "index.json"), index_json)
+        logger.info(f"Built {len(entries)} digests for week {week_start} in {index['seconds']}s ({len(errors)} failed)")
+        return index
+    finally:
+        redis_client.delete(LOCK_KEY)
+
+
+def run_schedule(workers=None):
+    """Run generate_reports every week at next_run(), forever.
+
+    Catches up first if last week's index is missing (e.g. the scheduler
+    was down when the run was due); the Redis lock still guards against a
+    second scheduler or a manual run overlapping.
+    """
+    while True:
+        if not os.path.exists(os.path.join(settings.REPORTS_DIR, last_week().isoformat(), "index.json")):
+            try:
+                generate_reports(workers=workers)
+            except Exception as e:
+                logger.error(f"Scheduled report run failed: {e}")
+        run = next_run()
+        logger.info(f"Next report run at {run.isoformat()}")
+        time.sleep(max(0.0, (run - datetime.now(timezone.utc)).total_seconds()))
@@ -0,0 +1,193 @@
+# app/utils/resilience.py
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from app.config import settings
+from app.utils.redis_operations import get_redis
+
+logger = logging.getLogger(__name__)
+
+STATE_CACHE_SECONDS = 1.0  # How long a process trusts its copy of a shared circuit state
+
+
+class UpstreamUnavailable(Exception):
+    """Raised instead of calling an upstream that is failing or saturated."""
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    pass
+
+
+class BulkheadFullError(UpstreamUnavailable):
+    pass
+
+
+def _is_refresh_error(exc):
+    # Checked by name so the OpenAI path never imports google-auth
+    return any(
+        cls.__name__ == "RefreshError" and cls.__module__ == "google.auth.exceptions"
+        for cls in type(exc).__mro__
+    )
+
+
+def is_failure(exc):
+    """Whether an exception says the upstream is unhealthy.
+
+    Client errors (4xx other than 429) mean the request was bad, not the
+    upstream, and must not trip the breaker. That includes oauthlib errors
+    such as a reused /oauth2callback code (status_code 400) and google-auth
+    RefreshError for a revoked or expired refresh token, unless google-auth
+    marks it retryable.
+    """
+    if _is_refresh_error(exc):
+        return bool(getattr(exc, "retryable", False))
+    status = (
+        getattr(exc, "http_status", None)
+        or getattr(getattr(exc, "resp", None), "status", None)
+        or getattr(exc, "status_code", None)
+    )
+    try:
+        status = int(status)
+    except (TypeError, ValueError):
+        return True
+    return status >= 500 or status == 429
+
+
+class CircuitBreaker:
+    """Failure counter that stops calls to an upstream for `reset_timeout` seconds.
+
+    With `shared` the state lives in a Redis hash, so one worker tripping the
+    breaker spares every other worker the same timeouts. Once the open period
+    ends calls are let through on trial: the first success closes the
+    breaker, the first failure reopens it. If Redis is unreachable the
+    breaker keeps working on its local state.
+    """
+
+    def __init__(self, name, failure_threshold, reset_timeout, shared=True):
+        self.name = name
+        self.key = f"circuit:{name}"
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.shared = shared
+        self.failures = 0
+        self.open_until = 0.0
+        self.synced_at = 0.0
+
+    def _sync(self):
+        now = time.time()
+        if not self.shared or now - self.synced_at < STATE_CACHE_SECONDS:
+            return
+        self.synced_at = now
+        try:
+            open_until = get_redis().hget(self.key, "open_until")
+            self.open_until = float(open_until) if open_until else 0.0
+        except Exception as e:
+            logger.debug(f"Could not read circuit {self.name} from Redis: {e}")
+
+    def allow(self):
+        self._sync()
+        return time.time() >= self.open_until
+
+    def record_success(self):
+        if not (self.failures or self.open_until):
+            return
+        self.failures = 0
+        self.open_until = 0.0
+        if self.shared:
+            try:
+                get_redis().delete(self.key)
+            except Exception as e:
+                logger.debug(f"Could not reset circuit {self.name} in Redis: {e}")
+
+    def record_failure(self):
+        self.failures += 1
+        failures = self.failures
+        if self.shared:
+            try:
+                pipe = get_redis().pipeline()
+                pipe.hincrby(self.key, "failures", 1)
+                pipe.expire(self.key, settings.CIRCUIT_WINDOW + self.reset_timeout)
+                failures = pipe.execute()[0]
+            except Exception as e:
+                logger.debug(f"Could not record failure for circuit {self.name} in Redis: {e}")
+        if failures < self.failure_threshold:
+            return
+
+        # Leave the count one short of the threshold so a failed trial call reopens at once
+        self.failures = self.failure_threshold - 1
+        self.open_until = time.time() + self.reset_timeout
+        logger.warning(f"Circuit {self.name} opened for {self.reset_timeout}s after {failures} failures")
+        if self.shared:
+            try:
+                get_redis().hset(self.key, mapping={
+                    "failures": self.failures, "open_until": self.open_until,
+                })
+            except Exception as e:
+                logger.debug(f"Could not open circuit {self.name} in Redis: {e}")
+
+
+class Bulkhead:
+    """Caps concurrent calls to one upstream so it cannot take every thread."""
+
+    def __init__(self, name, limit, wait):
+        self.name = name
+        self.wait = wait
+        self.semaphore = threading.BoundedSemaphore(limit)
+
+    @contextmanager
+    def slot(self, wait=None):
+        if not self.semaphore.acquire(timeout=self.wait if wait is None else wait):
+            raise BulkheadFullError(f"Too many concurrent calls to {self.name}")
+        try:
+            yield
+        finally:
+            self.semaphore.release()
+
+
+# upstream name -> (CircuitBreaker, Bulkhead), created on first use
+_guards = {}
+_guards_lock = threading.Lock()
+
+
+def _guard(upstream):
+    if upstream not in _guards:
+        with _guards_lock:
+            if upstream not in _guards:
+                _guards[upstream] = (
+                    CircuitBreaker(
+                        upstream,
+                        settings.CIRCUIT_FAILURE_THRESHOLD,
+                        settings.CIRCUIT_RESET_TIMEOUT,
+                    ),
+                    Bulkhead(upstream, settings.UPSTREAM_CONCURRENCY[upstream], settings.BULKHEAD_WAIT),
+                )
+    return _guards[upstream]
+
+
+def call(upstream, fn, *args, fallback=None, bulkhead_wait=None, **kwargs):
+    """Call `fn` through the circuit breaker and bulkhead for `upstream`.
+
+    Timeouts are set on the clients themselves (see settings.*_TIMEOUT); this
+    decides whether to call at all. When `fallback` is given it is returned
+    (called with the error) instead of raising. `bulkhead_wait` overrides
+    BULKHEAD_WAIT for callers that would rather queue for a slot than fail.
+    """
+    breaker, bulkhead = _guard(upstream)
+    try:
+        if not breaker.allow():
+            raise CircuitOpenError(f"{upstream} is unavailable (circuit open)")
+        with bulkhead.slot(bulkhead_wait):
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if is_failure(e):
+                    breaker.record_failure()
+                raise
+        breaker.record_success()
+        return result
+    except Exception as e:
+        if fallback is None:
+            raise
+        logger.warning(f"Call to {upstream} failed, using fallback: {e}")
+        return fallback(e)
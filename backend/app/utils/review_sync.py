@@ -0,0 +1,115 @@
+# app/utils/review_sync.py
+import logging
+from app.utils import db_operations, google_api, jobs, resilience
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 50  # Largest page reviews().list returns
+MAX_PAGES = 1000  # Guards against a page token that never runs out
+
+
+def list_reviews(service, location, page_token=None):
+    """One page of a location's reviews, most recently updated first."""
+    return google_api.execute(service.accounts().locations().reviews().list(
+        parent=f"accounts/{location['account_id']}/locations/{location['location_id']}",
+        pageSize=PAGE_SIZE,
+        pageToken=page_token,
+        orderBy="update_time desc",
+    ))
+
+
+def _upsert(location, page):
+    return db_operations.upsert_reviews(
+        location["name"], location["account_id"], location["location_id"], page.get("reviews", [])
+    )
+
+
+def index_reviews(service, location, first_page, max_pages=MAX_PAGES):
+    """Upsert a location's newest reviews page by page; returns (changed ids, done).
+
+    Pages come newest update first, so once the location's history has been
+    walked in full (see backfill) paging stops at the first page with nothing
+    new or edited. Before that only `first_page` is indexed here. `done` is
+    False when older pages may still need indexing: the backfill has not
+    finished, or `max_pages` ran out while pages were still changing.
+    """
+    changed, page, done = [], first_page, True
+    complete, _ = db_operations.load_sync_state(location["location_id"])
+    try:
+        for number in range(1, max_pages + 1):
+            page_changed = _upsert(location, page)
+            changed += page_changed
+            token = page.get("nextPageToken")
+            if not complete or not page_changed or not token:
+                done = complete
+                break
+            if number == max_pages:
+                done = False
+                break
+            page = list_reviews(service, location, token)
+    finally:
+        # Rollups for the pages that did commit are built even if a later page failed
+        db_operations.record_history(location["location_id"], changed, totals=first_page)
+    logger.debug(f"Indexed {len(changed)} new or edited reviews for {location['name']}")
+    return changed, done
+
+
+def backfill(service, location):
+    """Walk a location's whole history, resuming from where the last walk stopped.
+
+    The page token is saved after each page commits, so a walk cut short
+    (an error, a restart) picks up at the same page next time rather than
+    stopping at the unchanged first page. The last page marks the history
+    complete. Returns the ids that changed.
+    """
+    location_id = location["location_id"]
+    complete, token = db_operations.load_sync_state(location_id)
+    if complete:
+        return []
+    changed, first_page = [], None
+    try:
+        for _ in range(MAX_PAGES):
+            try:
+                page = list_reviews(service, location, token)
+            except Exception as e:
+                if token and not resilience.is_failure(e):
+                    # Google rejected the stored token (e.g. it expired); start over next time
+                    db_operations.save_sync_state(location_id, None)
+                raise
+            if token is None:
+                first_page = page
+            changed += _upsert(location, page)
+            token = page.get("nextPageToken")
+            db_operations.save_sync_state(location_id, token, history_complete=token is None)
+            if token is None:
+                break
+    finally:
+        db_operations.record_history(location_id, changed, totals=first_page)
+    logger.info(f"Backfilled {len(changed)} reviews for {location['name']} (complete: {token is None})")
+    return changed
+
+
+def sync(service, location, page_token=None):
+    """Bring a location's stored reviews up to date; returns the ids that changed.
+
+    Finishes the backfill if one is pending, otherwise pages from
+    `page_token` (the first page by default) until nothing changes.
+    """
+    complete, _ = db_operations.load_sync_state(location["location_id"])
+    if not complete:
+        return backfill(service, location)
+    changed, _ = index_reviews(service, location, list_reviews(service, location, page_token))
+    return changed
+
+
+def _sync_job(credentials_dict, location, page_token):
+    service = google_api.build_service(google_api.credentials_from_dict(credentials_dict))
+    return {"location_name": location["name"], "changed": len(sync(service, location, page_token))}
+
+
+def sync_in_background(credentials_dict, location, page_token=None):
+    """Run sync() as a background job, one at a time per location; returns the job id."""
+    return jobs.submit(
+        "review_sync", _sync_job, credentials_dict, location, page_token,
+        dedupe_key=f"review_sync:{location['location_id']}",
+    )
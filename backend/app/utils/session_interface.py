@@ -0,0 +1,95 @@
+# app/utils/session_interface.py
+import logging
+import secrets
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer
+from werkzeug.datastructures import CallbackDict
+
+logger = logging.getLogger(__name__)
+
+
+class RedisSession(CallbackDict, SessionMixin):
+    """Session dict that remembers its id, whether it changed, and its remaining TTL."""
+
+    def __init__(self, initial=None, sid=None, ttl=None):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.ttl = ttl
+        self.modified = False
+
+
+class RedisSessionInterface(SessionInterface):
+    """Server-side sessions in Redis, replacing Flask-Session's pickled store.
+
+    The cookie only carries a signed random id. Data is stored as compact
+    tagged JSON (Flask's own cookie serializer) instead of pickle, and is only
+    written back when a view changed the session. Unchanged sessions slide
+    their expiry with a single EXPIRE, at most once per `refresh_interval`.
+    """
+
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self, redis_client, key_prefix="session:", lifetime=86400, refresh_interval=3600):
+        self.redis = redis_client
+        self.key_prefix = key_prefix
+        self.lifetime = lifetime
+        self.refresh_interval = refresh_interval
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt="redis-session")
+
+    def open_session(self, app, request):
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if not cookie:
+            return RedisSession()
+        try:
+            sid = self._signer(app).unsign(cookie).decode()
+        except BadSignature:
+            return RedisSession()
+
+        try:
+            pipe = self.redis.pipeline()
+            pipe.get(self.key_prefix + sid)
+            pipe.ttl(self.key_prefix + sid)
+            data, ttl = pipe.execute()
+        except Exception as e:
+            # Redis is unreachable: serve the request logged out rather than fail it
+            logger.error(f"Could not load session: {e}")
+            return RedisSession()
+        if data is None:
+            return RedisSession()
+        return RedisSession(self.serializer.loads(data.decode()), sid=sid, ttl=ttl)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session:
+            if session.modified and session.sid:
+                self.redis.delete(self.key_prefix + session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        if session.modified:
+            if session.sid is None:
+                session.sid = secrets.token_urlsafe(16)
+            self.redis.setex(
+                self.key_prefix + session.sid, self.lifetime, self.serializer.dumps(dict(session))
+            )
+            response.set_cookie(
+                name,
+                self._signer(app).sign(session.sid).decode(),
+                expires=self.get_expiration_time(app, session),
+                httponly=self.get_cookie_httponly(app),
+                domain=domain,
+                path=path,
+                secure=self.get_cookie_secure(app),
+                samesite=self.get_cookie_samesite(app),
+            )
+        elif session.ttl is not None and session.ttl < self.lifetime - self.refresh_interval:
+            self.redis.expire(self.key_prefix + session.sid, self.lifetime)
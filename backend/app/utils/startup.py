@@ -0,0 +1,63 @@
+# app/utils/startup.py
+import importlib
+import logging
+import sys
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Heavy third-party modules the routes only need once a request arrives.
+# warm_up() imports them up front so a preloading gunicorn master can share
+# them with every worker it forks.
+HEAVY_MODULES = [
+    "openai",
+    "numpy",
+    "psycopg2",
+    "psycopg2.pool",
+    "psycopg2.extras",
+    "google.oauth2.credentials",
+    "google.auth.transport.requests",
+    "google_auth_oauthlib.flow",
+    "google_auth_httplib2",
+    "httplib2",
+    "googleapiclient.discovery",
+]
+
+# Phase name -> duration in milliseconds
+timings = {}
+
+
+@contextmanager
+def timed(phase):
+    """Record how long the wrapped block takes under `phase`."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[phase] = round((time.perf_counter() - started) * 1000, 2)
+
+
+def lazy_import(name):
+    """Import a module on first use, recording how long the import took."""
+    module = sys.modules.get(name)
+    if module is None:
+        with timed(f"import {name}"):
+            module = importlib.import_module(name)
+        logger.info(f"Imported {name} in {timings[f'import {name}']} ms")
+    return module
+
+
+def warm_up():
+    """Import every heavy module now instead of on the first request."""
+    for name in HEAVY_MODULES:
+        try:
+            lazy_import(name)
+        except ImportError as e:
+            logger.warning(f"Could not preload {name}: {e}")
+
+
+def report():
+    """Log every recorded startup phase."""
+    for phase, ms in timings.items():
+        logger.info(f"Startup: {phase} took {ms} ms")
@@ -0,0 +1,170 @@
+# app/utils/summary_operations.py
+import hashlib
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from app.config import settings
+from app.utils import model_routing
+from app.utils.location_registry import get_registry
+from app.utils.openai_operations import get_chat_completion
+from app.utils.redis_operations import get_redis, load_reviews, load_summary, store_summary
+
+logger = logging.getLogger(__name__)
+
+# Bump when the prompt changes so stored artifacts get a new version
+PROMPT_VERSION = "2"
+PROMPT = (
+    "Summarize each numbered customer review below in at most {words} words. "
+    "Return only a JSON array of strings, one summary per review, in order.\n\n{reviews}"
+)
+REVIEW_SUMMARY_TTL = 30 * 24 * 3600  # Seconds a per-review summary stays cached
+
+
+def summary_version(reviews_version, mode):
+    """Version of the summary built from a given reviews version, prompt and mode."""
+    return hashlib.sha1(f"{reviews_version}|{PROMPT_VERSION}|{mode}".encode()).hexdigest()[:16]
+
+
+def _review_key(comment, mode):
+    params = model_routing.MODES[mode]
+    content = f"{PROMPT_VERSION}|{params['model']}|{params['words']}|{comment}"
+    return f"review_summary:{hashlib.sha1(content.encode()).hexdigest()}"
+
+
+def _parse_summaries(text, expected):
+    """The JSON array of summaries in an LLM answer, or None if it is malformed."""
+    try:
+        summaries = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(summaries, list) or len(summaries) != expected:
+        return None
+    return [str(summary).strip() for summary in summaries]
+
+
+def _summarize_batch(comments, mode, stats):
+    """Summaries for a batch of comments in one call, falling back to one call each."""
+    params = model_routing.MODES[mode]
+
+    def complete(batch):
+        listing = "\n".join(f"{i + 1}. {comment}" for i, comment in enumerate(batch))
+        text, usage = get_chat_completion(
+            PROMPT.format(words=params["words"], reviews=listing),
+            model=params["model"],
+            temperature=0,
+            max_tokens=params["max_tokens"] * len(batch) + 20,
+            bulkhead_wait=settings.BATCH_BULKHEAD_WAIT,
+        )
+        # Batches run on several threads; list.append is safe to share between them
+        stats["calls"].append((params["model"], usage))
+        return text
+
+    summaries = _parse_summaries(complete(comments), len(comments))
+    if summaries is not None:
+        return summaries
+
+    logger.warning(f"Batch summary for {len(comments)} reviews was malformed; summarizing one by one")
+    summaries = []
+    for comment in comments:
+        text = complete([comment])
+        parsed = _parse_summaries(text, 1)
+        summaries.append(parsed[0] if parsed else text.strip())
+    return summaries
+
+
+def summarize_comments(comments, mode):
+    """Per-review summaries for `comments` under `mode`, plus run stats.
+
+    Each comment is routed (see model_routing.route): empty ones are dropped,
+    very short ones are used as is, short ones take the cheap mode and only
+    the rest use `mode`. Summaries are cached per comment, model and length,
+    so only comments never summarized that way reach the LLM.
+    """
+    start = time.perf_counter()
+    redis_client = get_redis()
+    routes = [model_routing.route(comment, mode) for comment in comments]
+    summaries = [comment if path == "verbatim" else None for comment, path in zip(comments, routes)]
+
+    pending = [i for i, path in enumerate(routes) if path in model_routing.MODES]
+    keys = {i: _review_key(comments[i], routes[i]) for i in pending}
+    if pending:
+        cached = redis_client.mget([keys[i] for i in pending])
+        for i, value in zip(pending, cached):
+            if value is not None:
+                summaries[i] = value.decode()
+
+    stats = {"calls": []}
+    counts = {"skipped": routes.count(None), "verbatim": routes.count("verbatim"), "cached": 0}
+    for path in model_routing.MODES:
+        missing = [i for i in pending if routes[i] == path and summaries[i] is None]
+        counts["cached"] += sum(1 for i in pending if routes[i] == path and summaries[i] is not None)
+        counts[path] = len(missing)
+        if not missing:
+            continue
+        params = model_routing.MODES[path]
+        size = params["batch_size"]
+        batches = [missing[n:n + size] for n in range(0, len(missing), size)]
+        with ThreadPoolExecutor(max_workers=model_routing.concurrency(path)) as executor:
+            results = executor.map(
+                lambda batch: _summarize_batch([comments[i] for i in batch], path, stats), batches
+            )
+            for batch, batch_summaries in zip(batches, results):
+                pipe = redis_client.pipeline()
+                for i, summary in zip(batch, batch_summaries):
+                    summaries[i] = summary
+                    pipe.setex(keys[i], REVIEW_SUMMARY_TTL, summary)
+                pipe.execute()
+
+    prompt_tokens = sum(usage["prompt_tokens"] for _, usage in stats["calls"])
+    completion_tokens = sum(usage["completion_tokens"] for _, usage in stats["calls"])
+    run_stats = {
+        "reviews": len(comments),
+        "llm_calls": len(stats["calls"]),
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "cost": round(sum(
+            model_routing.cost(model, usage["prompt_tokens"], usage["completion_tokens"])
+            for model, usage in stats["calls"]
+        ), 6),
+        "seconds": round(time.perf_counter() - start, 3),
+        "routes": counts,
+    }
+    return summaries, run_stats
+
+
+def generate_summary(location_name, mode=None):
+    """Summarize a location's stored reviews into a versioned artifact.
+
+    `mode` (fast, balanced or thorough) defaults to the location's own
+    summary_mode, then to SUMMARY_MODE. Returns None if no reviews are
+    stored. When an artifact for the current reviews and mode already exists
+    it is returned as is, so repeated triggers are free.
+    """
+    mode = model_routing.resolve_mode(mode, get_registry().find(name=location_name))
+    reviews_json, reviews_version = load_reviews(location_name)
+    if reviews_json is None:
+        return None
+
+    version = summary_version(reviews_version, mode)
+    artifact = load_summary(location_name, version)
+    if artifact is not None:
+        return artifact
+
+    comments = [review.get("comment", "") for review in json.loads(reviews_json)]
+    summaries, stats = summarize_comments(comments, mode)
+    model_routing.record_run(mode, stats)
+    logger.info(f"Summarized {location_name} in {mode} mode: {stats}")
+
+    artifact = {
+        "location_name": location_name,
+        "summary": " ".join(summary for summary in summaries if summary),
+        "mode": mode,
+        "version": version,
+        "reviews_version": reviews_version,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "stats": stats,
+    }
+    store_summary(location_name, artifact, settings.SUMMARY_TTL)
+    return artifact
@@ -0,0 +1,172 @@
+# app/utils/topic_operations.py
+import json
+import logging
+from collections import Counter
+from app.config import settings
+from app.models.review import STAR_RATINGS
+from app.utils import db_operations
+from app.utils.embedding_operations import embed, tokenize
+from app.utils.openai_operations import get_completion
+from app.utils.redis_operations import get_redis
+from app.utils.startup import lazy_import
+
+logger = logging.getLogger(__name__)
+
+TOPICS_TTL = 7 * 24 * 3600  # Seconds cached topics are kept per reviews version
+REPRESENTATIVES = 5  # Reviews closest to each centroid sent to the LLM
+STOPWORDS = set(
+    "a an and are as at be been but by car for from had has have he her his i "
+    "in is it its me my not of on or our so that the their them they this to "
+    "us very was we were what when which who will with you your".split()
+)
+
+# location_id -> VectorIndex for the stored reviews version
+_indexes = {}
+
+
+class VectorIndex:
+    """Brute-force cosine index over one location's review embeddings.
+
+    Locations hold thousands of reviews at most, where a single matrix-vector
+    product beats maintaining an approximate (HNSW) structure.
+    """
+
+    def __init__(self, version, reviews, vectors):
+        self.version = version
+        self.reviews = reviews
+        self.vectors = vectors
+        self.positions = {review["reviewId"]: i for i, review in enumerate(reviews)}
+
+    def search(self, vector, k, exclude=None):
+        np = lazy_import("numpy")
+        scores = self.vectors @ vector
+        if exclude is not None:
+            scores[exclude] = -np.inf
+        k = min(k, len(scores) - (exclude is not None))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.reviews[i], float(scores[i])) for i in top]
+
+
+def get_index(location):
+    """Return the index over a location's full review history in PostgreSQL.
+
+    It is rebuilt when the stored reviews change (another row, or a later
+    update_time), and None when none are stored yet.
+    """
+    version = db_operations.location_reviews_version(location["location_id"])
+    if version is None:
+        return None
+    index = _indexes.get(location["location_id"])
+    if index is None or index.version != version:
+        reviews = db_operations.fetch_location_reviews(location["location_id"])
+        vectors = embed([review["comment"] for review in reviews])
+        index = VectorIndex(version, reviews, vectors)
+        _indexes[location["location_id"]] = index
+    return index
+
+
+def similar_reviews(location, review_id=None, text=None, k=5):
+    """Reviews most similar to a stored review or to free text, as (review, score) pairs."""
+    index = get_index(location)
+    if index is None or not index.reviews:
+        return []
+    if review_id is not None:
+        position = index.positions.get(review_id)
+        if position is None:
+            return []
+        return index.search(index.vectors[position], k, exclude=position)
+    return index.search(embed([text])[0], k)
+
+
+def kmeans(vectors, k, iterations=25, seed=0):
+    """Spherical k-means with k-means++ seeding; returns (labels, centroids)."""
+    np = lazy_import("numpy")
+    rng = np.random.default_rng(seed)
+    centroids = [vectors[rng.integers(len(vectors))]]
+    for _ in range(1, k):
+        similarity = np.max(vectors @ np.array(centroids).T, axis=1)
+        distances = np.clip(1.0 - similarity.astype(np.float64), 0, None)
+        total = distances.sum()
+        if total == 0:
+            break
+        centroids.append(vectors[rng.choice(len(vectors), p=distances / total)])
+    centroids = np.array(centroids)
+
+    labels = None
+    for _ in range(iterations):
+        new_labels = np.argmax(vectors @ centroids.T, axis=1)
+        if labels is not None and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for c in range(len(centroids)):
+            members = vectors[labels == c]
+            if len(members):
+                centroid = members.sum(axis=0)
+                centroids[c] = centroid / (np.linalg.norm(centroid) or 1.0)
+    return labels, centroids
+
+
+def top_terms(cluster_reviews, all_counts, limit=5):
+    """Words frequent in the cluster relative to the whole location."""
+    counts = Counter(
+        token for review in cluster_reviews for token in set(tokenize(review["comment"]))
+        if token not in STOPWORDS and len(token) > 2
+    )
+    scored = {
+        token: count * count / all_counts[token]
+        for token, count in counts.items() if count > 1
+    }
+    return [token for token, _ in sorted(scored.items(), key=lambda item: -item[1])[:limit]]
+
+
+def location_topics(location):
+    """Cluster a location's reviews into topics, one LLM summary per cluster.
+
+    Results are cached in Redis per reviews version, so the clustering and
+    LLM calls run once per change to the stored reviews rather than once per
+    request.
+    """
+    np = lazy_import("numpy")
+    location_name = location["name"]
+    index = get_index(location)
+    if index is None:
+        return None
+    cache_key = f"topics_{location['location_id']}_{index.version}"
+    cached = get_redis().get(cache_key)
+    if cached is not None:
+        return json.loads(cached)
+
+    topics = []
+    if index.reviews:
+        k = min(settings.TOPIC_CLUSTERS, len(index.reviews))
+        labels, centroids = kmeans(index.vectors, k)
+        all_counts = Counter(
+            token for review in index.reviews for token in set(tokenize(review["comment"]))
+        )
+        for c in range(len(centroids)):
+            members = np.flatnonzero(labels == c)
+            if not len(members):
+                continue
+            cluster_reviews = [index.reviews[i] for i in members]
+            closest = members[np.argsort(-(index.vectors[members] @ centroids[c]))[:REPRESENTATIVES]]
+            comments = "\n".join(f"- {index.reviews[i]['comment']}" for i in closest)
+            ratings = [STAR_RATINGS.get(review.get("starRating")) for review in cluster_reviews]
+            ratings = [rating for rating in ratings if rating]
+            topics.append({
+                "size": len(members),
+                "average_rating": round(sum(ratings) / len(ratings), 2) if ratings else None,
+                "terms": top_terms(cluster_reviews, all_counts),
+                "summary": get_completion(
+                    "These customer reviews share a theme. Name the theme and "
+                    f"summarize it in 20 words: ```{comments}```"
+                ),
+                "review_ids": [review["reviewId"] for review in cluster_reviews],
+            })
+        topics.sort(key=lambda topic: -topic["size"])
+
+    result = {"location_name": location_name, "reviews_version": index.version, "topics": topics}
+    get_redis().setex(cache_key, TOPICS_TTL, json.dumps(result))
+    return result
@@ -0,0 +1,31 @@
+# generate_reports.py
+"""Build the weekly digests for every location; run from cron or a scheduler.
+
+    python generate_reports.py                      # last complete week
+    python generate_reports.py --week 2026-01-05    # a given week (its Monday)
+    python generate_reports.py --schedule           # every REPORT_WEEKDAY at REPORT_HOUR
+
+--schedule keeps running, so it can be deployed as its own service from the
+backend image with this as the command. Set REPORT_REFRESH_TOKEN so each run
+syncs reviews from Google before building the digests.
+"""
+import argparse
+import logging
+from datetime import date
+from app.utils.report_operations import generate_reports, run_schedule
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build weekly review digests")
+    parser.add_argument("--week", type=date.fromisoformat, help="Monday of the week to report on")
+    parser.add_argument("--location", action="append", dest="locations", help="Only this location (repeatable)")
+    parser.add_argument("--workers", type=int, help="Processes to build digests with")
+    parser.add_argument("--schedule", action="store_true", help="Keep running and build last week's digests weekly")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.schedule:
+        run_schedule(args.workers)
+    index = generate_reports(args.week, args.locations, args.workers)
+    if index is None:
+        raise SystemExit("Another report run is in progress")
+    raise SystemExit(1 if index["errors"] else 0)
@@ -0,0 +1,22 @@
+# gunicorn.conf.py
+import os
+
+bind = "0.0.0.0:5000"
+workers = int(os.environ.get("GUNICORN_WORKERS", "2"))
+# Threaded workers, so the per-process bulkheads in app/utils/resilience.py
+# have concurrent calls to limit: a slow upstream ties up at most its
+# bulkhead's share of threads and the rest keep serving other routes.
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "16"))
+
+# In "preload" mode the master imports run:app (and its heavy modules) once,
+# then forks workers that share that warm state instead of each paying for it.
+# Redis connection pools reconnect per process, so nothing else has to reset.
+preload_app = os.environ.get("STARTUP_MODE", "lazy") == "preload"
+
+# Seconds a request may run before its worker is killed. Bulk reply drafting
+# and posting run as background jobs (see app/utils/jobs.py); this covers the
+# slowest request left, POST /summarize_reviews in "thorough" mode. A worker
+# that is restarting gets as long again to let its running jobs finish.
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = timeout
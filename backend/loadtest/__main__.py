@@ -0,0 +1,223 @@
+# loadtest/__main__.py
+"""Find how many concurrent dashboard users the backend sustains.
+
+For each worker configuration the app is started under gunicorn with Google
+OAuth, the reviews API and OpenAI pointed at local stubs, then driven by an
+increasing number of virtual users. Redis and PostgreSQL are the real ones
+from the environment (.env), as for the app itself.
+
+    python -m loadtest --configs 1,2,4,2x4 --levels 1,5,10,25,50 --duration 30
+
+A config is a worker count, optionally with threads per worker ("2x4" runs 2
+gthread workers of 4 threads). With --target the harness skips starting
+anything and drives an app that is already running.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from loadtest.journeys import fetch_locations, run_level
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    return sorted_values[max(math.ceil(p * len(sorted_values)) - 1, 0)]
+
+
+def summarize(recorder, elapsed, users):
+    """Throughput, error rate and latency percentiles for one concurrency level."""
+    every = sorted(latency for latencies in recorder.latencies.values() for latency in latencies)
+    errors = sum(recorder.errors.values())
+    endpoints = {}
+    for name, latencies in sorted(recorder.latencies.items()):
+        latencies = sorted(latencies)
+        endpoints[name] = {
+            "requests": len(latencies),
+            "errors": recorder.errors[name],
+            "p50": percentile(latencies, 0.5),
+            "p99": percentile(latencies, 0.99),
+        }
+    return {
+        "users": users,
+        "requests": len(every),
+        "throughput": len(every) / elapsed if elapsed else 0.0,
+        "error_rate": errors / len(every) if every else 0.0,
+        "p50": percentile(every, 0.5),
+        "p90": percentile(every, 0.9),
+        "p99": percentile(every, 0.99),
+        "endpoints": endpoints,
+    }
+
+
+def find_saturation(levels, max_error_rate, max_p99, min_gain):
+    """The level with the most throughput before errors, latency or flat throughput set in.
+
+    A level saturates when it breaks the error or p99 budget, or adds less
+    than `min_gain` (a fraction) of throughput over the best level so far.
+    """
+    best, saturated_at = None, None
+    for level in levels:
+        within_budget = level["error_rate"] <= max_error_rate and (level["p99"] or 0) <= max_p99
+        if not within_budget or (best and level["throughput"] < best["throughput"] * (1 + min_gain)):
+            saturated_at = level["users"]
+            break
+        best = level
+    return {
+        "users": best["users"] if best else None,
+        "throughput": best["throughput"] if best else None,
+        "saturated_at": saturated_at,
+    }
+
+
+def parse_config(config):
+    workers, _, threads = config.partition("x")
+    return int(workers), int(threads or 1)
+
+
+def wait_until_up(url, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=2)
+            return
+        except Exception:
+            time.sleep(0.5)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def start_stubs(args):
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "loadtest.stubs",
+            "--port", str(args.stub_port),
+            "--token-latency", str(args.token_latency),
+            "--reviews-latency", str(args.reviews_latency),
+            "--llm-latency", str(args.llm_latency),
+            "--review-count", str(args.review_count),
+        ],
+        cwd=BACKEND_DIR,
+    )
+    wait_until_up(f"http://127.0.0.1:{args.stub_port}/v4/accounts/a/locations/l/reviews")
+    return process
+
+
+def start_app(args, workers, threads):
+    stub = f"http://127.0.0.1:{args.stub_port}"
+    env = {
+        **os.environ,
+        "TOKEN_URI": f"{stub}/token",
+        "GOOGLE_API_ENDPOINT": f"{stub}/",
+        "OPENAI_API_BASE": f"{stub}/v1",
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "loadtest"),
+        "EMBEDDING_PROVIDER": "hashing",
+        # The stubs and the app speak plain HTTP
+        "OAUTHLIB_INSECURE_TRANSPORT": "1",
+        "GUNICORN_WORKERS": str(workers),
+    }
+    for name in ("CLIENT_ID", "CLIENT_SECRET", "SECRET_KEY"):
+        env.setdefault(name, "loadtest")
+    env.setdefault("REDIRECT_URIS", f"http://127.0.0.1:{args.app_port}/oauth2callback")
+
+    process = subprocess.Popen(
+        [
+            "gunicorn", "-c", "gunicorn.conf.py",
+            "--bind", f"127.0.0.1:{args.app_port}",
+            "--workers", str(workers),
+            "--threads", str(threads),
+            "run:app",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    wait_until_up(f"http://127.0.0.1:{args.app_port}/check_auth")
+    return process
+
+
+def stop(process):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def run_config(args, base_url):
+    locations = asyncio.run(fetch_locations(base_url))
+    levels = []
+    for users in args.levels:
+        recorder, elapsed = asyncio.run(run_level(base_url, users, args.duration, locations, args.think_time))
+        level = summarize(recorder, elapsed, users)
+        levels.append(level)
+        print(
+            f"  {users:>5} users  {level['throughput']:8.1f} req/s  "
+            f"errors {level['error_rate']:6.2%}  p50 {level['p50'] or 0:6.3f}s  "
+            f"p90 {level['p90'] or 0:6.3f}s  p99 {level['p99'] or 0:6.3f}s",
+            flush=True,
+        )
+    return levels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--configs", default="1,2,4", help="Worker configurations, e.g. 1,2,4,2x4")
+    parser.add_argument("--levels", default="1,5,10,25,50,100",
+                        type=lambda value: [int(users) for users in value.split(",")],
+                        help="Concurrent users per step")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds per concurrency level")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between journeys, in seconds")
+    parser.add_argument("--target", help="URL of an app that is already running; nothing is started")
+    parser.add_argument("--app-port", type=int, default=5050)
+    parser.add_argument("--stub-port", type=int, default=8089)
+    parser.add_argument("--token-latency", type=float, default=0.1)
+    parser.add_argument("--reviews-latency", type=float, default=0.3)
+    parser.add_argument("--llm-latency", type=float, default=0.8)
+    parser.add_argument("--review-count", type=int, default=50)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--max-p99", type=float, default=5.0, help="p99 budget in seconds")
+    parser.add_argument("--min-gain", type=float, default=0.05,
+                        help="Throughput gain below which more users count as saturation")
+    parser.add_argument("--output", default="loadtest-report.json")
+    args = parser.parse_args()
+
+    report = {"settings": {key: value for key, value in vars(args).items()}, "configs": []}
+    if args.target:
+        configs = [("target", None)]
+    else:
+        configs = [(config, parse_config(config)) for config in args.configs.split(",")]
+
+    stubs = None if args.target else start_stubs(args)
+    try:
+        for name, worker_config in configs:
+            print(f"Config {name}", flush=True)
+            app = None if worker_config is None else start_app(args, *worker_config)
+            try:
+                levels = run_config(args, args.target or f"http://127.0.0.1:{args.app_port}")
+            finally:
+                if app is not None:
+                    stop(app)
+            saturation = find_saturation(levels, args.max_error_rate, args.max_p99, args.min_gain)
+            print(
+                f"  saturation: {saturation['users']} users at "
+                f"{saturation['throughput'] or 0:.1f} req/s (saturated at {saturation['saturated_at']})",
+                flush=True,
+            )
+            report["configs"].append({"config": name, "levels": levels, "saturation": saturation})
+    finally:
+        if stubs is not None:
+            stop(stubs)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
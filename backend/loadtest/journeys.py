@@ -0,0 +1,127 @@
+# loadtest/journeys.py
+"""Scripted user journeys, each run by many concurrent virtual users."""
+import asyncio
+import random
+import time
+from collections import defaultdict
+from urllib.parse import parse_qs, urlparse
+import aiohttp
+
+REVIEW_FIELDS = "reviewId,starRating,comment,createTime,reviewer.displayName"
+SEARCH_TERMS = ["service", "oil change", "finance", "parts", "friendly"]
+
+
+class Recorder:
+    """Latency and outcome of every request, grouped by endpoint name."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, name, seconds, ok):
+        self.latencies[name].append(seconds)
+        if not ok:
+            self.errors[name] += 1
+
+
+class VirtualUser:
+    """One dashboard user with their own cookie jar (and so their own session)."""
+
+    def __init__(self, base_url, recorder, locations, think_time=0.0):
+        self.base_url = base_url.rstrip("/")
+        self.recorder = recorder
+        self.locations = locations
+        self.think_time = think_time
+        # unsafe: keep cookies set by an IP address host such as 127.0.0.1
+        self.client = aiohttp.ClientSession(cookie_jar=aiohttp.CookieJar(unsafe=True))
+
+    async def close(self):
+        await self.client.close()
+
+    async def request(self, name, method, path, expect=(200,), **kwargs):
+        """Send a request and record it; returns (status, parsed JSON or None)."""
+        start = time.perf_counter()
+        status, body = None, None
+        try:
+            async with self.client.request(method, self.base_url + path, allow_redirects=False, **kwargs) as response:
+                status = response.status
+                if response.content_type == "application/json":
+                    body = await response.json()
+                else:
+                    await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+        self.recorder.record(name, time.perf_counter() - start, status in expect)
+        return status, body
+
+    async def think(self):
+        if self.think_time:
+            await asyncio.sleep(random.expovariate(1 / self.think_time))
+
+    async def login(self):
+        """/authorize, then the redirect back from Google's consent screen, then /check_auth."""
+        status, body = await self.request("authorize", "GET", "/authorize")
+        if status != 200:
+            return False
+        state = parse_qs(urlparse(body["authorization_url"]).query)["state"][0]
+        status, _ = await self.request(
+            "oauth2callback", "GET", "/oauth2callback",
+            expect=(302,),
+            params={"state": state, "code": "loadtest", "scope": "https://www.googleapis.com/auth/business.manage"},
+        )
+        if status != 302:
+            return False
+        status, body = await self.request("check_auth", "GET", "/check_auth")
+        return status == 200 and body.get("isAuthenticated", False)
+
+    async def dashboard(self):
+        """What the front end does when a manager picks a location."""
+        location_name = random.choice(self.locations)
+        await self.request("check_auth", "GET", "/check_auth")
+        await self.request(
+            "fetch_reviews", "GET", "/fetch_reviews",
+            params={"location_name": location_name, "fields": REVIEW_FIELDS},
+        )
+        status, _ = await self.request(
+            "summary", "GET", "/summary", expect=(200, 404), params={"location_name": location_name}
+        )
+        if status == 404:
+            await self.request("summarize_reviews", "POST", "/summarize_reviews", json={"location_name": location_name})
+        await self.request("trends", "GET", "/trends", params={"location_name": location_name})
+
+    async def search(self):
+        await self.request("search_reviews", "GET", "/search_reviews", params={"q": random.choice(SEARCH_TERMS)})
+
+    async def run(self, deadline):
+        """Log in, then browse until `deadline`; a small share of users log in again."""
+        logged_in = await self.login()
+        while time.monotonic() < deadline:
+            roll = random.random()
+            if not logged_in or roll < 0.1:
+                logged_in = await self.login()
+            elif roll < 0.8:
+                await self.dashboard()
+            else:
+                await self.search()
+            await self.think()
+
+
+async def fetch_locations(base_url):
+    async with aiohttp.ClientSession() as client:
+        async with client.get(base_url.rstrip("/") + "/locations") as response:
+            response.raise_for_status()
+            body = await response.json()
+    return [location["name"] for location in body["locations"]]
+
+
+async def run_level(base_url, users, duration, locations, think_time=0.0):
+    """Run `users` concurrent virtual users for `duration` seconds."""
+    recorder = Recorder()
+    deadline = time.monotonic() + duration
+    virtual_users = [VirtualUser(base_url, recorder, locations, think_time) for _ in range(users)]
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(user.run(deadline) for user in virtual_users))
+    finally:
+        await asyncio.gather(*(user.close() for user in virtual_users))
+    return recorder, time.perf_counter() - start
@@ -0,0 +1,135 @@
+# loadtest/stubs.py
+"""Local stand-ins for Google OAuth, the My Business reviews API and OpenAI.
+
+Each answers after a configurable delay, so the app under test waits on its
+upstreams the way it does in production without any real calls being made.
+Run on its own with `python -m loadtest.stubs --port 8089`.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import secrets
+import time
+from aiohttp import web
+
+COMMENTS = [
+    "Great service, the team had my Jeep back the same day.",
+    "Waited two hours for an oil change and nobody told me why.",
+    "Sales staff were friendly and did not pressure us at all.",
+    "Parts counter had what I needed and the price was fair.",
+    "",
+    "Good",
+    "The finance office took forever but the car is great.",
+    "Collision center fixed the bumper perfectly, looks brand new.",
+]
+STAR_RATINGS = ["ONE", "TWO", "THREE", "FOUR", "FIVE"]
+
+
+def make_reviews(location_id, count):
+    """Deterministic reviews per location, so summaries stay cacheable across calls."""
+    rng = random.Random(location_id)
+    return [
+        {
+            "reviewId": f"{location_id}-{i}",
+            "reviewer": {"displayName": f"Customer {i}"},
+            "starRating": rng.choice(STAR_RATINGS),
+            "comment": rng.choice(COMMENTS),
+            "createTime": f"2026-01-{i % 28 + 1:02d}T12:00:00Z",
+            "updateTime": f"2026-01-{i % 28 + 1:02d}T12:00:00Z",
+        }
+        for i in range(count)
+    ]
+
+
+async def token(request):
+    """Google OAuth token endpoint: any code or refresh token is accepted."""
+    await asyncio.sleep(request.app["latency"]["token"])
+    form = await request.post()
+    return web.json_response({
+        "access_token": secrets.token_urlsafe(24),
+        "refresh_token": form.get("refresh_token") or secrets.token_urlsafe(24),
+        "expires_in": 3600,
+        "token_type": "Bearer",
+        "scope": "https://www.googleapis.com/auth/business.manage",
+    })
+
+
+async def list_reviews(request):
+    await asyncio.sleep(request.app["latency"]["reviews"])
+    reviews = make_reviews(request.match_info["location_id"], request.app["review_count"])
+    return web.json_response({"reviews": reviews, "totalReviewCount": len(reviews)})
+
+
+def _answer(prompt):
+    """Answer in the shape the app asks for: a JSON array with one string per
+    numbered line for batch prompts (summaries, reply drafts), else plain text."""
+    if "JSON array" in prompt:
+        numbered = re.findall(r"^(\d+)\. ", prompt, flags=re.MULTILINE)
+        return json.dumps([f"Stub answer for item {number}." for number in numbered])
+    return f"Stub summary of {len(prompt)} characters."
+
+
+async def chat_completion(request):
+    await asyncio.sleep(request.app["latency"]["llm"])
+    body = await request.json()
+    prompt = body["messages"][-1]["content"]
+    return web.json_response({
+        "id": f"chatcmpl-{secrets.token_hex(8)}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "gpt-3.5-turbo"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": _answer(prompt)},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": 8, "total_tokens": len(prompt) // 4 + 8},
+    })
+
+
+async def embeddings(request):
+    await asyncio.sleep(request.app["latency"]["llm"] / 4)
+    body = await request.json()
+    texts = body["input"] if isinstance(body["input"], list) else [body["input"]]
+    return web.json_response({
+        "object": "list",
+        "model": body.get("model"),
+        "data": [
+            {"object": "embedding", "index": i, "embedding": random.Random(text).sample(range(-100, 100), 16)}
+            for i, text in enumerate(texts)
+        ],
+        "usage": {"prompt_tokens": 0, "total_tokens": 0},
+    })
+
+
+def make_app(token_latency=0.1, reviews_latency=0.3, llm_latency=0.8, review_count=50):
+    app = web.Application()
+    app["latency"] = {"token": token_latency, "reviews": reviews_latency, "llm": llm_latency}
+    app["review_count"] = review_count
+    app.router.add_post("/token", token)
+    app.router.add_get("/v4/accounts/{account_id}/locations/{location_id}/reviews", list_reviews)
+    app.router.add_post("/v1/chat/completions", chat_completion)
+    app.router.add_post("/v1/embeddings", embeddings)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--token-latency", type=float, default=0.1)
+    parser.add_argument("--reviews-latency", type=float, default=0.3)
+    parser.add_argument("--llm-latency", type=float, default=0.8)
+    parser.add_argument("--review-count", type=int, default=50)
+    args = parser.parse_args()
+    web.run_app(
+        make_app(args.token_latency, args.reviews_latency, args.llm_latency, args.review_count),
+        host="127.0.0.1",
+        port=args.port,
+        print=None,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -28,6 +28,7 @@ const App = () => {
   const [selectedLocation, setSelectedLocation] = useState(null);
   const [loading, setLoading] = useState(false);
   const [summary, setSummary] = useState("");
+  const [locations, setLocations] = useState([]);
   const gradientButtonStyle = {
     background: "linear-gradient(to right, #ff9966, #ff5e62)",
     color: "white",
@@ -67,14 +68,31 @@ const App = () => {
     }
   }, []);
 
+  // Effect for loading the location list once logged in
+  useEffect(() => {
+    if (!isAuthenticated) return;
+
+    fetch("https://localhost:5000/locations", {
+      credentials: "include",
+    })
+      .then((response) => response.json())
+      .then((data) => setLocations(data.locations || []))
+      .catch((error) => {
+        console.error("Error fetching locations:", error);
+        message.error(`Failed to fetch locations: ${error}`);
+      });
+  }, [isAuthenticated]);
+
   // Effect for fetching reviews
   useEffect(() => {
     if (!selectedLocation) return;
 
     setLoading(true);
     const token = localStorage.getItem("access_token");
-    fetchReviews(token, selectedLocation);
-    fetchSummary(token, selectedLocation); // Fetch the summary here
+    // The summary follows the reviews, so it is looked up for the version just synced
+    fetchReviews(token, selectedLocation).then(() =>
+      fetchSummary(token, selectedLocation)
+    );
   }, [selectedLocation]);
 
   // Effect for logging the current state of reviews
@@ -98,16 +116,20 @@ const App = () => {
       });
   };
 
+  // Only the review fields the list below renders
+  const REVIEW_FIELDS =
+    "reviewId,reviewer.displayName,reviewer.profilePhotoUrl,createTime,starRating,comment";
+
   // Function to fetch reviews from the backend
   const fetchReviews = (token, selectedLocation) => {
+    const url = `https://localhost:5000/fetch_reviews?location_name=${encodeURIComponent(
+      selectedLocation
+    )}&fields=${REVIEW_FIELDS}`;
     // Debug line to check the fetch URL
-    console.log(
-      "Fetch URL:",
-      `https://localhost:5000/fetch_reviews?location_name=${selectedLocation}`
-    );
+    console.log("Fetch URL:", url);
 
-    fetch(
-      `https://localhost:5000/fetch_reviews?location_name=${selectedLocation}`,
+    return fetch(
+      url,
       {
         headers: {
           Authorization: `Bearer ${token}`,
@@ -156,18 +178,31 @@ const App = () => {
       });
   };
 
-  // Function to fetch summary and handle cache expiry
+  // Function to fetch the summary of the current reviews, generating it only when missing
   const fetchSummary = async (token, selectedLocation) => {
     try {
-      const response = await fetch(`https://localhost:5000/summarize_reviews`, {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-          Authorization: `Bearer ${token}`,
-        },
-        credentials: "include",
-        body: JSON.stringify({ location_name: selectedLocation }),
-      });
+      const location = encodeURIComponent(selectedLocation);
+      let response = await fetch(
+        `https://localhost:5000/summary?location_name=${location}`,
+        {
+          headers: {
+            Authorization: `Bearer ${token}`,
+          },
+          credentials: "include",
+        }
+      );
+      if (response.status === 404) {
+        // No artifact yet: explicitly trigger generation
+        response = await fetch(`https://localhost:5000/summarize_reviews`, {
+          method: "POST",
+          headers: {
+            "Content-Type": "application/json",
+            Authorization: `Bearer ${token}`,
+          },
+          credentials: "include",
+          body: JSON.stringify({ location_name: selectedLocation }),
+        });
+      }
       const data = await response.json();
       console.log("Received Summary:", data);  // Debugging line
       if (data.summary) {
@@ -182,72 +217,6 @@ const App = () => {
   };
   
 
-  // Location Constant
-  const LOCATIONS = {
-    "Reed Jeep Chrysler Dodge Ram of Kansas City Service Center": [
-      "107525660123223074874",
-      "6602925040958900944",
-    ],
-    "Reed Jeep of Kansas City": [
-      "107525660123223074874",
-      "1509419292313302599",
-    ],
-    "Reed Jeep Chrysler Dodge Ram of Kansas City Parts Store": [
-      "107525660123223074874",
-      "13301160076946238237",
-    ],
-    "Reed Chrysler Dodge Jeep Ram": [
-      "111693813506330378362",
-      "11797626926263627465",
-    ],
-    "Reed Jeep Ram Service Center of St. Joseph": [
-      "111693813506330378362",
-      "14280468831929260325",
-    ],
-    "Reed Jeep Ram Parts Store": [
-      "111693813506330378362",
-      "2418643850076402830",
-    ],
-    "Reed Hyundai St. Joseph": [
-      "106236436844097816145",
-      "11886236645408970450",
-    ],
-    "Reed Hyundai Service Center St. Joseph": [
-      "106236436844097816145",
-      "14394473597121013675",
-    ],
-    "Reed Hyundai of Kansas City": [
-      "109745744288166151974",
-      "8949845982319380160",
-    ],
-    "Reed Hyundai Service Center of Kansas City": [
-      "109745744288166151974",
-      "14191266722711425624",
-    ],
-    "Reed Hyundai Parts Store": [
-      "109745744288166151974",
-      "16832194732739486696",
-    ],
-    "Reed Collision Center": ["118020935772003776996", "14476819248161239911"],
-    "Reed Chevrolet of St Joseph": [
-      "101540168465155832676",
-      "4906344306812977154",
-    ],
-    "Reed Chevrolet Service Center": [
-      "101540168465155832676",
-      "7432353734414121407",
-    ],
-    "Reed Chevrolet Parts": ["101540168465155832676", "13264330561216148213"],
-    "Reed Buick GMC, INC.": ["109231983509135903650", "9980434767027047433"],
-    "Reed Buick GMC Service Center": [
-      "109231983509135903650",
-      "9597638825461585665",
-    ],
-    "Reed Buick GMC Collision Center": [
-      "109231983509135903650",
-      "10315051056232587965",
-    ],
-  };
   return (
     <Layout>
       <Sider width={300} className="ant-layout-sider-light">
@@ -292,9 +261,9 @@ const App = () => {
                   onChange={(value) => setSelectedLocation(value)}
                   style={{ width: "50%" }}
                 >
-                  {Object.keys(LOCATIONS).map((location) => (
-                    <Option key={location} value={location}>
-                      {location}
+                  {locations.map((location) => (
+                    <Option key={location.location_id} value={location.name}>
+                      {location.name}
                     </Option>
                   ))}
                 </Select>